@@ -1,26 +1,7 @@
-import json
 from discord import app_commands
 import discord
 from discord.ext import commands
 
-from COGS.paths import data_path
-
-SERVER_FILE = data_path("JSON/server.json")
-
-
-def load_verified_users():
-    try:
-        with open(SERVER_FILE, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            users = set(str(user["user_id"]) for user in data.get("verified_users", []))
-            return users
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error loading verified users: {e}")
-        return set()
-
-
-verified_users = load_verified_users()
-
 
 def is_verified():
     async def predicate(interaction: discord.Interaction):
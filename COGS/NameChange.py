@@ -1,32 +1,13 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, Interaction, ui
-import json
 import logging
-from pathlib import Path
 
-from COGS.paths import data_path
+from COGS.verified_store import get_verified_store
 
-SERVER_JSON_PATH = data_path("JSON/server.json")
 REQUEST_CHANNEL_ID = 1249491219348852828  # Channel to send the request embed
 logger = logging.getLogger(__name__)
 
-def load_server_json():
-    with open(SERVER_JSON_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def save_server_json(data):
-    with open(SERVER_JSON_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
-
-def sync_server_data(bot, data):
-    for cog in bot.cogs.values():
-        server_data_path = getattr(cog, "server_data_path", None)
-        if server_data_path is None:
-            continue
-        if Path(server_data_path).resolve() == Path(SERVER_JSON_PATH).resolve():
-            cog.server_data = data
-
 def get_discord_admin_role(guild: discord.Guild):
     return discord.utils.get(guild.roles, name="Discord Admins")
 
@@ -116,39 +97,14 @@ class NameChangeView(ui.View):
                 self.user_id,
             )
 
-        data = load_server_json()
-        verified_users = data.setdefault("verified_users", [])
-        found = False
-        for user in verified_users:
-            if str(user.get("user_id")) == str(self.user_id):
-                user["habbo"] = self.new_username
-                found = True
-                break
-        if not found:
-            verified_users.append({"user_id": str(self.user_id), "habbo": self.new_username})
         try:
-            save_server_json(data)
+            get_verified_store().rename(self.user_id, self.new_username)
         except Exception:
             logger.error(
                 "Failed to update server.json for user %s",
                 self.user_id,
                 exc_info=True,
             )
-        else:
-            sync_server_data(interaction.client, data)
-
-        data = load_server_json()
-        verified_users = data.setdefault("verified_users", [])
-        found = False
-        for user in verified_users:
-            if str(user.get("user_id")) == str(self.user_id):
-                user["habbo"] = self.new_username
-                found = True
-                break
-        if not found:
-            verified_users.append({"user_id": str(self.user_id), "habbo": self.new_username})
-        save_server_json(data)
-        sync_server_data(interaction.client, data)
 
         await self.update_embed(interaction, "approved", interaction.user)
 
@@ -169,6 +125,9 @@ class NameChangeCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_unload(self):
+        await get_verified_store().backend.flush()
+
     @app_commands.command(
         name="namechange",
         description="Input New Username"
@@ -176,11 +135,7 @@ class NameChangeCog(commands.Cog):
     @app_commands.describe(username="The new username you want to set.")
     async def namechange(self, interaction: discord.Interaction, username: str):
         user_id = str(interaction.user.id)
-        data = load_server_json()
-        user_entry = next(
-            (user for user in data.get("verified_users", []) if str(user.get("user_id")) == user_id),
-            None,
-        )
+        user_entry = get_verified_store().get(user_id)
 
         if not user_entry:
             await interaction.response.send_message("You are not a verified user.", ephemeral=True)
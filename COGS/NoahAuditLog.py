@@ -1,25 +1,33 @@
 import discord
 from discord.ext import commands
 
+from COGS.member_events import MemberChange, get_member_dispatcher
+
 AUDIT_LOG_CHANNEL_ID = 1374748024286351501
 TARGET_USER_ID = 298121351871594497
 
 class BotAuditCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.member_subscription = get_member_dispatcher(bot).subscribe(
+            "BotAuditCog", self.on_member_change, any_role=True, nick=True
+        )
+
+    async def cog_unload(self):
+        get_member_dispatcher(self.bot).unsubscribe(self.member_subscription)
 
     async def send_audit_log(self, embed: discord.Embed):
         channel = self.bot.get_channel(AUDIT_LOG_CHANNEL_ID)
         if channel:
             await channel.send(embed=embed)
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
+    async def on_member_change(self, change: MemberChange):
+        before, after = change.before, change.after
         if after.guild.me is None:
             return
         async for entry in after.guild.audit_logs(limit=3, user=after.guild.me, action=discord.AuditLogAction.member_update):
             if entry.target.id == after.id and (discord.utils.utcnow() - entry.created_at).total_seconds() < 15:
-                if before.nick != after.nick:
+                if change.nick_changed:
                     embed = discord.Embed(
                         title="Nickname Changed (by Bot)",
                         description=f"**User:** {after.mention}\n**Before:** `{before.nick}`\n**After:** `{after.nick}`",
@@ -27,11 +35,9 @@ class BotAuditCog(commands.Cog):
                     )
                     embed.set_footer(text=f"User ID: {after.id}")
                     await self.send_audit_log(embed)
-                if before.roles != after.roles:
-                    before_roles = set(before.roles)
-                    after_roles = set(after.roles)
-                    added = after_roles - before_roles
-                    removed = before_roles - after_roles
+                if change.roles_changed:
+                    added = change.added_roles
+                    removed = change.removed_roles
                     if added:
                         embed = discord.Embed(
                             title="Role Added (by Bot)",
@@ -1,264 +1,526 @@
+import asyncio
 import discord
-import aiohttp
+import hashlib
+import heapq
+import io
 import json
-import os
+import random
 import time
 from discord.ext import commands, tasks
-from COGS.paths import data_path
+from COGS.habbo_api import DEFAULT_HOTEL, get_habbo_client
+from COGS.log_digest import LogDigest
+from COGS.member_roles import apply_role_diff
+from COGS.role_resolver import CDA_EMPLOYEE_ROLE_ID, RoleResolver, get_role_resolver
+from COGS.storage import get_backend
+from COGS.verified_store import get_verified_store
+
+BACKFILL_DELAY = 1.0  # seconds between uniqueId lookups during backfill
+SWEEP_CONCURRENCY = 8  # verified users reconciled in parallel by update_roles_task
+
+# Role refresh scheduler: instead of a burst every 10 minutes, a steady stream of
+# checks ordered by staleness, with recent joins/role changes moved up the queue.
+SCHEDULER_TICK = 10         # seconds of work planned per scheduler tick
+CHECKS_PER_SECOND = 1.0     # budget of user checks (each ~1 Habbo + Discord call)
+SCHEDULER_JITTER = 0.5      # max random delay (seconds) added to each check
+RECENT_WINDOW = 3600        # joins / role changes newer than this are prioritised
+RECENT_JOIN_BOOST = 6 * 3600    # treat recent joiners as this many seconds more stale
+RECENT_CHANGE_BOOST = 3600      # same for users whose roles changed recently
+STATE_SAVE_INTERVAL = 60    # seconds between checkpoints of last_checked/cycle progress
+ROLE_SYNC_STATE = "role_sync"
+PLAN_CONCURRENCY = 32       # members resolved in parallel by `noah roleplan` (read-only, cache-friendly)
 
 class AutoRoleUpdater(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.roles_file_path = data_path("JSON/rolesbadges.json")
-        self.server_data_path = data_path("JSON/server.json")
-        self.roles_data = self.load_roles_data()
-        self.server_data = self.load_server_data()
+        self.store = get_verified_store()
+        self.habbo_api = get_habbo_client(bot)
+        self.guild_id = 1248307521119060028  # Replace with your server's ID
         self.verified_role_id = 1277489459226738808
         self.awaiting_verification_role_id = 1248310200939581594
+        self.role_log = LogDigest(bot, 1248316058520260713, "Roles Updated")  # Replace with your log channel ID
+
+        self.backend = get_backend()
+        self.sync_state = self.backend.load_state(ROLE_SYNC_STATE)
+        self.sync_state.setdefault("users", {})
+        # Progress of the current refresh cycle; restored so a restart resumes it.
+        self.cycle = self.sync_state.setdefault("cycle", self._new_cycle(0))
+        self.cycle["stats"] = {**self._empty_stats(), **self.cycle.get("stats", {})}
+        self._state_saved_at = time.monotonic()
+        self._due_now: set[str] = set()
 
         self.update_roles_task.start()  # Start the automatic update task
+        self.backfill_unique_ids_task.start()
+
+    async def cog_unload(self):
+        self.update_roles_task.cancel()
+        self.backfill_unique_ids_task.cancel()
+        self.backend.save_state(ROLE_SYNC_STATE, self.sync_state)
+        await self.role_log.close()
+        await self.backend.flush()
+
+    @staticmethod
+    def _empty_stats() -> dict:
+        return {"updated": 0, "unchanged": 0, "skipped": 0, "not_in_guild": 0, "no_habbo_data": 0, "failed": 0}
+
+    @classmethod
+    def _new_cycle(cls, run: int) -> dict:
+        return {
+            "run": run,
+            "started_at": time.time(),
+            "checks": 0,
+            "last_user_id": None,
+            "last_checked_at": None,
+            "stats": cls._empty_stats(),
+        }
+
+    @property
+    def sweep_stats(self) -> dict:
+        return self.cycle["stats"]
+
+    @staticmethod
+    def _fingerprint(values) -> str:
+        return hashlib.sha1(",".join(sorted(map(str, values))).encode()).hexdigest()[:16]
+
+    def _fingerprints(self, member, groups_data) -> tuple[str, str]:
+        """Hashes of the managed Habbo groups and managed Discord roles a member has.
+
+        The group hash includes the mapping's mtime so a rolesbadges.json edit
+        invalidates every stored fingerprint.
+        """
+        resolver = get_role_resolver()
+        group_ids = {g.get("id") for g in groups_data if isinstance(g, dict)} & resolver.group_ids
+        role_ids = {role.id for role in member.roles} & resolver.managed_role_ids
+        return self._fingerprint([*group_ids, f"mapping:{resolver.mtime_ns}"]), self._fingerprint(role_ids)
 
-    def load_roles_data(self):
-        """Load the role mapping from JSON."""
-        if os.path.exists(self.roles_file_path):
-            try:
-                with open(self.roles_file_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    return data.get("roles", {})
-            except json.JSONDecodeError:
-                print(f"Error decoding {self.roles_file_path}. Ensure it's valid JSON.")
-                return {}
-        return {}
-
-    def load_server_data(self):
-        """Load the list of verified users from JSON."""
-        if os.path.exists(self.server_data_path):
-            try:
-                with open(self.server_data_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    return data if "verified_users" in data else {"verified_users": []}
-            except json.JSONDecodeError:
-                print(f"Error decoding {self.server_data_path}. Ensure it's valid JSON.")
-                return {"verified_users": []}
-        return {"verified_users": []}
-
-    @tasks.loop(minutes=10)  # Runs every 10 minutes
+    def request_check(self, user_id) -> None:
+        """Move a user to the front of the refresh queue."""
+        self._due_now.add(str(user_id))
+
+    def _priority(self, guild, user_id: str, now: float) -> float:
+        """Lower is sooner: last check time, pulled forward for recent joins/changes.
+
+        Each boost only lasts until the first check after the join or change,
+        so a busy hour of joins cannot keep everyone else waiting.
+        """
+        if user_id in self._due_now:
+            return float("-inf")
+        state = self.sync_state["users"].get(user_id, {})
+        last_checked = state.get("last_checked", 0)
+        priority = last_checked
+        # last_changed is stamped by the check that changed the roles, so it
+        # equals last_checked until the follow-up check has run.
+        last_changed = state.get("last_changed", 0)
+        if now - last_changed < RECENT_WINDOW and last_changed >= last_checked:
+            priority -= RECENT_CHANGE_BOOST
+        member = guild.get_member(int(user_id))
+        if member is not None and member.joined_at:
+            joined_at = member.joined_at.timestamp()
+            if now - joined_at < RECENT_WINDOW and last_checked < joined_at:
+                priority -= RECENT_JOIN_BOOST
+        return priority
+
+    def _candidates(self, guild) -> list[dict]:
+        """Verified users who are members of ``guild``; one cycle checks each once."""
+        return [
+            entry for entry in self.store.entries()
+            if guild.get_member(int(entry["user_id"])) is not None
+        ]
+
+    def _pick_due_users(self, guild, count: int, candidates: list[dict] | None = None) -> list[dict]:
+        now = time.time()
+        if candidates is None:
+            candidates = self._candidates(guild)
+        return heapq.nsmallest(
+            count, candidates, key=lambda entry: self._priority(guild, str(entry["user_id"]), now)
+        )
+
+    @tasks.loop(seconds=SCHEDULER_TICK)
     async def update_roles_task(self):
-        """Automatically check and update roles for all verified users."""
-        guild = self.bot.get_guild(1248307521119060028)  # Replace with your server's ID
+        """Continuously re-check the stalest verified users at CHECKS_PER_SECOND."""
+        guild = self.bot.get_guild(self.guild_id)
 
         if not guild:
             print("Guild not found.")
             return
 
-        async with aiohttp.ClientSession() as session:
-            for user_data in self.server_data["verified_users"]:
-                user_id = int(user_data["user_id"])
-                habbo_name = user_data["habbo"]
-
-                member = guild.get_member(user_id)
-                if not member:
-                    continue  # Skip if user is not found in the server
-
-                # Fetch Habbo data
-                user_url = f"https://www.habbo.com/api/public/users?name={habbo_name}"
-                async with session.get(user_url) as user_response:
-                    if user_response.status == 200:
-                        user_json = await user_response.json()
-                        habbo_id = user_json.get("uniqueId")
-
-                        groups_url = f"https://www.habbo.com/api/public/users/{habbo_id}/groups"
-                        async with session.get(groups_url) as groups_response:
-                            if groups_response.status == 200:
-                                groups_data = await groups_response.json()
-
-                                # Assign roles only if needed
-                                added_roles, removed_roles = await self.assign_roles(member, groups_data, guild)
-
-                                # Skip logging or updating if no changes are needed
-                                if added_roles is None and removed_roles is None:
-                                    continue
-
-                                # Log role updates if they occurred
-                                log_channel = guild.get_channel(1248316058520260713)  # Replace with your log channel ID
-                                if log_channel:
-                                    embed = discord.Embed(title="Roles Updated", color=discord.Color.green())
-                                    embed.add_field(name="User", value=f"{member.mention}", inline=False)
-                                    if added_roles:
-                                        embed.add_field(name="Added Roles", value="\n".join(added_roles), inline=False)
-                                    if removed_roles:
-                                        embed.add_field(name="Removed Roles", value="\n".join(removed_roles), inline=False)
-                                    await log_channel.send(embed=embed)
-
-    async def assign_roles(self, member, groups_data, guild):
+        candidates = self._candidates(guild)
+        batch = self._pick_due_users(guild, max(1, round(SCHEDULER_TICK * CHECKS_PER_SECOND)), candidates)
+        if not batch:
+            return
+
+        # Spread this tick's checks evenly over the tick, each with a little jitter.
+        queue = asyncio.Queue()
+        tick_start = time.monotonic()
+        for index, user_data in enumerate(batch):
+            start_at = tick_start + index / CHECKS_PER_SECOND + random.uniform(0, SCHEDULER_JITTER)
+            queue.put_nowait((start_at, user_data))
+
+        workers = [
+            asyncio.create_task(self._sweep_worker(guild, queue))
+            for _ in range(min(SWEEP_CONCURRENCY, queue.qsize()))
+        ]
+        await asyncio.gather(*workers)
+
+        # One "cycle" = as many checks as there are verified users in the guild.
+        if self.cycle["checks"] >= len(candidates):
+            elapsed = time.time() - self.cycle["started_at"]
+            print(f"[AutoRoleUpdater] Refresh cycle #{self.cycle['run']} of {self.cycle['checks']} checks "
+                  f"took {elapsed:.1f}s: {self.sweep_stats}")
+            self.cycle = self.sync_state["cycle"] = self._new_cycle(self.cycle["run"] + 1)
+
+        if time.monotonic() - self._state_saved_at >= STATE_SAVE_INTERVAL:
+            self.backend.save_state(ROLE_SYNC_STATE, self.sync_state)
+            self._state_saved_at = time.monotonic()
+
+    async def _sweep_worker(self, guild, queue: asyncio.Queue):
+        """Pull scheduled checks off the shared queue until it is empty."""
+        while True:
+            try:
+                start_at, user_data = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            delay = start_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            user_id = str(user_data["user_id"])
+            self._due_now.discard(user_id)
+            try:
+                result = await self.reconcile_user(guild, user_data)
+            except Exception as e:
+                print(f"[AutoRoleUpdater] Failed to reconcile {user_id}: {e}")
+                result = "failed"
+            self.sweep_stats[result] += 1
+
+            now = time.time()
+            state = self.sync_state["users"].setdefault(user_id, {})
+            state["last_checked"] = now
+            if result == "updated":
+                state["last_changed"] = now
+            self.cycle["checks"] += 1
+            self.cycle["last_user_id"] = user_id
+            self.cycle["last_checked_at"] = now
+
+    async def reconcile_user(self, guild, user_data) -> str:
+        """Bring one verified user's roles in line with their Habbo groups."""
+        member = guild.get_member(int(user_data["user_id"]))
+        if not member:
+            return "not_in_guild"  # Skip if user is not found in the server
+
+        # Fetch Habbo groups straight from the stored uniqueId
+        habbo_id = await self.store.ensure_unique_id(user_data, self.habbo_api)
+        if not habbo_id:
+            return "no_habbo_data"
+
+        groups_data = await self.habbo_api.get_groups(habbo_id, user_data.get("hotel", DEFAULT_HOTEL))
+        if groups_data is None:
+            return "no_habbo_data"
+
+        # Nothing relevant changed on either side since the last in-sync reconcile
+        state = self.sync_state["users"].setdefault(str(user_data["user_id"]), {})
+        groups_fp, roles_fp = self._fingerprints(member, groups_data)
+        if state.get("groups_fingerprint") == groups_fp and state.get("roles_fingerprint") == roles_fp:
+            return "skipped"
+
+        # Assign roles only if needed
+        added_roles, removed_roles = await self.assign_roles(member, groups_data, guild, user_data)
+
+        # In sync: remember both sides so the next check can skip the diff.
+        # The motto is not fingerprinted, so a CDA Employee role that is only
+        # kept by the motto guard must keep being re-checked.
+        if added_roles == [] and removed_roles == []:
+            if self._kept_by_motto(member, groups_data):
+                state.pop("groups_fingerprint", None)
+                state.pop("roles_fingerprint", None)
+            else:
+                state["groups_fingerprint"], state["roles_fingerprint"] = groups_fp, roles_fp
+            return "unchanged"
+        state.pop("groups_fingerprint", None)
+        state.pop("roles_fingerprint", None)
+
+        # Skip logging if the update failed
+        if added_roles is None and removed_roles is None:
+            return "failed"
+
+        # Queue a log entry; the digest delivers it in the background
+        embed = discord.Embed(title="Roles Updated", color=discord.Color.green())
+        embed.add_field(name="User", value=f"{member.mention}", inline=False)
+        if added_roles:
+            embed.add_field(name="Added Roles", value="\n".join(added_roles), inline=False)
+        if removed_roles:
+            embed.add_field(name="Removed Roles", value="\n".join(removed_roles), inline=False)
+        self.role_log.push(
+            embed,
+            f"{member} ({member.id}): +[{', '.join(added_roles)}] -[{', '.join(removed_roles)}]",
+        )
+        return "updated"
+
+    @staticmethod
+    def _kept_by_motto(member, groups_data) -> bool:
+        """True if the member holds CDA Employee that their groups alone would remove."""
+        if member.get_role(CDA_EMPLOYEE_ROLE_ID) is None:
+            return False
+        return CDA_EMPLOYEE_ROLE_ID not in get_role_resolver().expected_roles(groups_data)
+
+    async def plan_roles(self, member, groups_data, user_data=None, profile=None, resolver=None):
         """
-        Assign roles based on Habbo groups:
+        Work out (roles_to_add, roles_to_remove) from Habbo groups without touching Discord:
         - EmployeeRoles: assign ONLY the single highest role (based on JSON order).
         - DonatorRoles/Misc/SpecialUnits: additive.
         - 'CDA Employee' and 'iC' umbrella flags come from ANY matched employee role.
-        """
-        roles_data = self.roles_data
-        added_roles = []
-        removed_roles = []
-
-        cda_employee_role_id = 1248313244481884220
-        ic_member_role_id = 1249819550015426571
 
+        The CDA motto guard reads ``profile`` if given; otherwise the profile is
+        only looked up (by uniqueId, normally a cache hit) when CDA would be removed.
+        """
+        resolver = resolver or get_role_resolver()
+        # Roles deleted from the guild can never be added; leaving them in would
+        # make the member look permanently out of sync.
+        expected_roles = {
+            role_id for role_id in resolver.expected_roles(groups_data) if member.guild.get_role(role_id)
+        }
         current_roles = {role.id for role in member.roles}
-        expected_roles = set()
-
-        # Track all managed role IDs so we can remove ones users shouldn't have
-        valid_role_ids = set()
-        for category in ["EmployeeRoles", "DonatorRoles", "Misc", "SpecialUnits"]:
-            for role_data in roles_data.get(category, []):
-                rid = role_data.get("role_id")
-                if rid:
-                    valid_role_ids.add(rid)
-
-        # Build a set of Habbo group IDs for quick lookups
-        group_ids = {g.get("id") for g in groups_data if isinstance(g, dict) and g.get("id")}
-
-        # Employee roles: collect all matches, then pick the highest by JSON order (first match)
-        employee_roles = roles_data.get("EmployeeRoles", [])
-        matched_employee_roles = [rd for rd in employee_roles if rd.get("group_id") in group_ids]
-        highest_employee_role = matched_employee_roles[0] if matched_employee_roles else None
-
-        has_cda_employee = False
-        has_ic_role = False
-
-        # Add ONLY the highest employee role
-        if highest_employee_role:
-            role = guild.get_role(highest_employee_role.get("role_id"))
-            if role:
-                expected_roles.add(role.id)
-
-        # Umbrella flags from ANY matched employee role
-        for emp_role in matched_employee_roles:
-            if emp_role.get("cdaemployee") == "yes":
-                has_cda_employee = True
-            if emp_role.get("iC") == "yes":
-                has_ic_role = True
-
-        # Other categories (additive)
-        for category in ["DonatorRoles", "Misc", "SpecialUnits"]:
-            for role_data in roles_data.get(category, []):
-                if role_data.get("group_id") in group_ids:
-                    role = guild.get_role(role_data.get("role_id"))
-                    if role:
-                        expected_roles.add(role.id)
-
-        # Add/remove umbrella roles
-        if has_cda_employee:
-            expected_roles.add(cda_employee_role_id)
-        else:
-            valid_role_ids.add(cda_employee_role_id)
-
-        if has_ic_role:
-            expected_roles.add(ic_member_role_id)
-        else:
-            valid_role_ids.add(ic_member_role_id)
-
-        # Compute diffs
         roles_to_add = expected_roles - current_roles
-        roles_to_remove = (current_roles - expected_roles) & valid_role_ids
-        roles_to_remove -= roles_to_add  # avoid race if role is both in add/remove due to timing
+        roles_to_remove = (current_roles - expected_roles) & resolver.managed_role_ids
 
         # Motto guard for CDA removal
-        # Get Habbo name from server_data
-        habbo_name = None
-        for entry in self.server_data.get("verified_users", []):
-            if int(entry.get("user_id", 0)) == member.id:
-                habbo_name = entry.get("habbo")
-                break
-
-        motto = ""
-        if habbo_name:
-            try:
-                async with aiohttp.ClientSession() as session:
-                    user_url = f"https://www.habbo.com/api/public/users?name={habbo_name}"
-                    async with session.get(user_url) as response:
-                        if response.status == 200:
-                            user_json = await response.json()
-                            motto = user_json.get("motto", "")
-            except Exception:
-                motto = ""
-
-        if cda_employee_role_id in roles_to_remove and "cda" in motto.lower():
-            roles_to_remove.remove(cda_employee_role_id)
-
-        # If nothing to do, return early
+        if CDA_EMPLOYEE_ROLE_ID in roles_to_remove:
+            if profile is None:
+                profile = await self._fetch_profile(user_data or self.store.get(member.id))
+            motto = (profile or {}).get("motto", "") or ""
+            if "cda" in motto.lower():
+                roles_to_remove.remove(CDA_EMPLOYEE_ROLE_ID)
+        return roles_to_add, roles_to_remove
+
+    async def assign_roles(self, member, groups_data, guild, user_data=None):
+        """
+        Apply the plan_roles diff to ``member``.
+
+        Returns ([], []) if already in sync and (None, None) if the update failed.
+        """
+        roles_to_add, roles_to_remove = await self.plan_roles(member, groups_data, user_data)
+
+        # Already in sync
         if not roles_to_add and not roles_to_remove:
-            return None, None
+            return [], []
 
         try:
-            # Add needed roles
-            for role_id in roles_to_add:
-                role = guild.get_role(role_id)
-                if role:
-                    await member.add_roles(role, reason="AutoRoleUpdater: add")
-                    added_roles.append(role.name)
-
-            # Remove unneeded roles
-            for role_id in roles_to_remove:
-                role = guild.get_role(role_id)
-                if role:
-                    await member.remove_roles(role, reason="AutoRoleUpdater: remove")
-                    removed_roles.append(role.name)
-
-        except discord.Forbidden:
-            print(f"Skipping {member.name} - Missing permissions to update roles.")
-            return None, None
+            added_roles, removed_roles = await apply_role_diff(
+                member, roles_to_add, roles_to_remove, reason="AutoRoleUpdater: sync"
+            )
         except Exception as e:
             print(f"Unexpected error while updating roles for {member.name}: {e}")
             return None, None
 
+        if not added_roles and not removed_roles:
+            print(f"Skipping {member.name} - Missing permissions to update roles.")
+            return None, None
+
         return added_roles, removed_roles
 
+    async def _fetch_profile(self, user_data):
+        if not user_data:
+            return None
+        hotel = user_data.get("hotel", DEFAULT_HOTEL)
+        if user_data.get("unique_id"):
+            return await self.habbo_api.get_user_by_id(user_data["unique_id"], hotel)
+        return await self.habbo_api.get_user(user_data["habbo"], hotel)
+
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Runs the moment someone joins the guild."""
         # Are they in server.json ? verified_users?
-        entry = next((
-            u for u in self.server_data.get("verified_users", [])
-            if int(u["user_id"]) == member.id
-        ), None)
+        entry = self.store.get(member.id)
 
         if entry is None:
             return  # not a verified user, leave them alone
 
-        # 1) nickname ? Habbo name
+        # 1) "Verified" instead of "Awaiting Verification", nickname = Habbo name
+        roles_to_add = {self.verified_role_id}
+        roles_to_remove = {self.awaiting_verification_role_id}
+
+        # 2) plus all other appropriate roles from their Habbo groups
+        habbo_id = await self.store.ensure_unique_id(entry, self.habbo_api)
+        groups_data = await self.habbo_api.get_groups(habbo_id, entry.get("hotel", DEFAULT_HOTEL)) if habbo_id else None
+        if groups_data is None:
+            self.request_check(member.id)  # let the scheduler retry shortly
+        else:
+            group_add, group_remove = await self.plan_roles(member, groups_data, entry)
+            roles_to_add |= group_add
+            roles_to_remove |= group_remove
+
+        # 3) one member edit for all of it
         try:
-            await member.edit(nick=entry["habbo"])
-        except discord.Forbidden:
-            pass  # lacking manage-nicknames permission is not fatal
-
-        # 2) remove "Awaiting Verification", add "Verified"
-        guild = member.guild
-        await member.remove_roles(
-            guild.get_role(self.awaiting_verification_role_id),
-            reason="User is verified"
+            await apply_role_diff(
+                member, roles_to_add, roles_to_remove - roles_to_add,
+                reason="User is verified", nick=entry["habbo"],
+            )
+        except discord.HTTPException as e:
+            print(f"[AutoRoleUpdater] Failed to restore roles for {member} ({member.id}): {e}")
+            self.request_check(member.id)
+
+    def sweep_position(self, upcoming: int = 5) -> dict:
+        """Where the refresh cycle currently is, plus the next users due."""
+        guild = self.bot.get_guild(self.guild_id)
+        candidates = self._candidates(guild) if guild is not None else []
+        total = len(candidates)
+        position = {
+            **self.cycle,
+            "total": total,
+            "progress": round(self.cycle["checks"] / total, 3) if total else 0.0,
+            "due_now": len(self._due_now),
+            "next_up": [],
+        }
+        if guild is not None:
+            position["next_up"] = [
+                str(entry["user_id"]) for entry in self._pick_due_users(guild, upcoming, candidates)
+            ]
+        return position
+
+    @commands.command(name="sweepstatus", help="Show the role refresh cycle's current position.")
+    @commands.is_owner()
+    async def sweep_status(self, ctx):
+        position = self.sweep_position()
+        embed = discord.Embed(title="Role Sweep Status", color=discord.Color.blurple())
+        embed.add_field(
+            name=f"Cycle #{position['run']}",
+            value=(f"{position['checks']}/{position['total']} checks ({position['progress']:.0%})\n"
+                   f"Started <t:{int(position['started_at'])}:R>"),
+            inline=False,
         )
-        await member.add_roles(
-            guild.get_role(self.verified_role_id),
-            reason="User is verified"
+        if position["last_user_id"]:
+            embed.add_field(
+                name="Last checked",
+                value=f"<@{position['last_user_id']}> <t:{int(position['last_checked_at'])}:R>",
+                inline=False,
+            )
+        next_up = " ".join(f"<@{user_id}>" for user_id in position["next_up"]) or "None"
+        embed.add_field(name=f"Next up ({position['due_now']} requested)", value=next_up, inline=False)
+        embed.add_field(
+            name="Results this cycle",
+            value="\n".join(f"{key}: {value}" for key, value in position["stats"].items()),
+            inline=False,
         )
+        await ctx.send(embed=embed)
 
-        # 3) give all other appropriate roles immediately
-        async with aiohttp.ClientSession() as session:
-            # replicated from update_roles_task ? get Habbo groups
-            user_url = f"https://www.habbo.com/api/public/users?name={entry['habbo']}"
-            async with session.get(user_url) as r:
-                if r.status != 200:
-                    return
-                habbo_id = (await r.json()).get("uniqueId")
+    @commands.command(name="roleplan", help="Dry-run the role sweep and report every planned change.")
+    @commands.is_owner()
+    async def role_plan(self, ctx):
+        """Resolve roles for every verified member without editing anyone.
 
-            groups_url = f"https://www.habbo.com/api/public/users/{habbo_id}/groups"
-            async with session.get(groups_url) as r:
-                if r.status != 200:
-                    return
-                groups_data = await r.json()
+        Attach a candidate rolesbadges.json to plan against it instead of the
+        live mapping.
+        """
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            await ctx.send("Guild not found.")
+            return
 
-        await self.assign_roles(member, groups_data, guild)
+        resolver = get_role_resolver()
+        source = "current rolesbadges.json"
+        if ctx.message.attachments:
+            attachment = ctx.message.attachments[0]
+            try:
+                data = json.loads(await attachment.read())
+                resolver = RoleResolver(data.get("roles") if isinstance(data, dict) else None)
+            except Exception as e:
+                await ctx.send(f"Could not use `{attachment.filename}`: {e}")
+                return
+            source = attachment.filename
+
+        status = await ctx.send(f"Planning roles for {len(self.store)} verified users against {source}...")
+        semaphore = asyncio.Semaphore(PLAN_CONCURRENCY)
+        timings = {"fetch": 0.0, "compute": 0.0}
+        counts = {"changes": 0, "in_sync": 0, "not_in_guild": 0, "no_habbo_data": 0, "failed": 0}
+        added_total: dict[int, int] = {}
+        removed_total: dict[int, int] = {}
+        lines = []
+
+        def role_name(role_id):
+            role = guild.get_role(role_id)
+            return role.name.replace("\n", " ") if role else str(role_id)
+
+        async def plan_one(entry):
+            member = guild.get_member(int(entry["user_id"]))
+            if member is None:
+                counts["not_in_guild"] += 1
+                return
+            async with semaphore:
+                started = time.perf_counter()
+                hotel = entry.get("hotel", DEFAULT_HOTEL)
+                habbo_id = entry.get("unique_id")
+                profile = None
+                if not habbo_id:
+                    profile = await self.habbo_api.get_user(entry["habbo"], hotel)
+                    habbo_id = (profile or {}).get("uniqueId")
+                groups_data = await self.habbo_api.get_groups(habbo_id, hotel) if habbo_id else None
+                fetched = time.perf_counter()
+                timings["fetch"] += fetched - started
+                if groups_data is None:
+                    counts["no_habbo_data"] += 1
+                    return
+                try:
+                    to_add, to_remove = await self.plan_roles(
+                        member, groups_data, entry, profile=profile, resolver=resolver
+                    )
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"[AutoRoleUpdater] Planning failed for {member}: {e}")
+                    return
+                finally:
+                    timings["compute"] += time.perf_counter() - fetched
+
+            if not to_add and not to_remove:
+                counts["in_sync"] += 1
+                return
+            counts["changes"] += 1
+            for role_id in to_add:
+                added_total[role_id] = added_total.get(role_id, 0) + 1
+            for role_id in to_remove:
+                removed_total[role_id] = removed_total.get(role_id, 0) + 1
+            lines.append(
+                f"{member} ({member.id}) [{entry['habbo']}]"
+                f" +[{', '.join(sorted(map(role_name, to_add)))}]"
+                f" -[{', '.join(sorted(map(role_name, to_remove)))}]"
+            )
+
+        started = time.perf_counter()
+        cache_before = self.habbo_api.cache_stats()
+        await asyncio.gather(*(plan_one(entry) for entry in self.store.entries()))
+        elapsed = time.perf_counter() - started
+        cache_after = self.habbo_api.cache_stats()
+
+        summary = [
+            f"Role plan against {source}",
+            f"Users: {len(self.store)} | " + " | ".join(f"{key}: {value}" for key, value in counts.items()),
+            f"Wall time: {elapsed:.2f}s | Habbo fetch: {timings['fetch']:.2f}s | compute: {timings['compute']:.2f}s"
+            f" (summed over {PLAN_CONCURRENCY} workers)",
+            f"Cache hits: {cache_after['hits'] - cache_before['hits']} | misses: {cache_after['misses'] - cache_before['misses']}",
+            "",
+            "Roles added: " + (", ".join(f"{role_name(rid)} x{n}" for rid, n in sorted(added_total.items(), key=lambda i: -i[1])) or "none"),
+            "Roles removed: " + (", ".join(f"{role_name(rid)} x{n}" for rid, n in sorted(removed_total.items(), key=lambda i: -i[1])) or "none"),
+            "",
+        ]
+        report = "\n".join(summary + sorted(lines))
+        file = discord.File(io.BytesIO(report.encode("utf-8")), filename=f"roleplan_{int(time.time())}.txt")
+        await status.edit(content="\n".join(summary[:4]))
+        await ctx.send(file=file)
+
+    @tasks.loop(hours=1)
+    async def backfill_unique_ids_task(self):
+        """Record Habbo uniqueIds for users verified before they were stored."""
+        missing = self.store.missing_unique_ids()
+        if not missing:
+            return
+        resolved = 0
+        for entry in missing:
+            if await self.store.ensure_unique_id(entry, self.habbo_api):
+                resolved += 1
+            await asyncio.sleep(BACKFILL_DELAY)
+        print(f"[AutoRoleUpdater] Backfilled {resolved}/{len(missing)} Habbo uniqueIds.")
+
+    @backfill_unique_ids_task.before_loop
+    async def before_backfill_unique_ids_task(self):
+        await self.bot.wait_until_ready()
 
     @update_roles_task.before_loop
     async def before_update_roles_task(self):
@@ -1,16 +1,15 @@
-import json
 import discord
 from discord.ext import commands
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
 
-from COGS.paths import data_path
+from COGS.verified_store import get_verified_store
 
 class AnnouncerCog(commands.Cog):
-    def __init__(self, bot, config_path=None):
+    def __init__(self, bot):
         self.bot = bot
-        self.config_path = config_path or data_path("JSON/server.json")
+        self.store = get_verified_store()
         self.announcement_channel_id = self._load_announcement_channel_id()
         self.scheduler = AsyncIOScheduler()
         self.external_emoji = "<:Pay:1305265714042765483>"  # Replace if needed
@@ -23,10 +22,8 @@ class AnnouncerCog(commands.Cog):
     # ??????????????????????????????????????????????????????????
     def _load_announcement_channel_id(self):
         try:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                return config["channels"]["payannounce"]
-        except (KeyError, FileNotFoundError, json.JSONDecodeError) as exc:
+            return self.store.channels["payannounce"]
+        except KeyError as exc:
             print(f"[PayAnnounce] Error loading announcement channel ID: {exc}")
             return None
 
@@ -1,10 +1,8 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import json
-import os
 
-from COGS.paths import data_path
+from COGS.verified_store import get_verified_store
 
 # Role IDs
 ALLOWED_ROLES = {1315693406336450570, 1248310818693582920}
@@ -14,17 +12,10 @@ AWAITING_ROLE_ID = 1248310200939581594
 class VerificationAdminReset(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.server_data_path = data_path("JSON/server.json")
+        self.store = get_verified_store()
 
-    def load_server_data(self):
-        if os.path.exists(self.server_data_path):
-            with open(self.server_data_path, "r", encoding="utf-8") as file:
-                return json.load(file)
-        return {"verified_users": [], "channels": {"verification": None}}
-
-    def save_server_data(self, data):
-        with open(self.server_data_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, indent=4)
+    async def cog_unload(self):
+        await self.store.backend.flush()
 
     def has_admin_role(self, member: discord.Member) -> bool:
         return any(role.id in ALLOWED_ROLES for role in member.roles)
@@ -44,18 +35,11 @@ class VerificationAdminReset(commands.Cog):
             )
             return
 
-        server_data = self.load_server_data()
-        before_count = len(server_data.get("verified_users", []))
         # Remove user from verified_users list
-        server_data["verified_users"] = [
-            u for u in server_data.get("verified_users", [])
-            if str(u.get("user_id")) != str(user.id)
-        ]
-        self.save_server_data(server_data)
-        after_count = len(server_data["verified_users"])
+        removed = self.store.remove(user.id)
 
         # Only do role swap if the user was actually unverified
-        if before_count != after_count:
+        if removed:
             verified_role = user.guild.get_role(VERIFIED_ROLE_ID)
             awaiting_role = user.guild.get_role(AWAITING_ROLE_ID)
             actions = []
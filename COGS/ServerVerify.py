@@ -1,177 +1,209 @@
 from discord import app_commands
 import discord
 from discord.ext import commands, tasks
-import aiohttp
-import json
-import os
+import asyncio
+import heapq
 import time
 import random
 import string
 from COGS.BotCheck import is_verified
-from COGS.paths import data_path
+from COGS.habbo_api import DEFAULT_HOTEL, get_habbo_client
+from COGS.member_roles import apply_role_diff
+from COGS.role_resolver import ROLES_POLL_INTERVAL, get_role_resolver, reload_if_changed, validate_roles_data
+from COGS.storage import get_backend
+from COGS.verified_store import get_verified_store
 from COGS.WelcomeDM import send_welcome_dm
 
+CODE_TTL = 600                # seconds a verification code stays valid
+MOTTO_POLL_INTERVAL = 30      # seconds between background motto checks of pending codes
+MOTTO_POLL_CONCURRENCY = 5    # Habbo profile fetches in flight per poll
+
 
 class HabboVerifyCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.roles_file_path = data_path("JSON/rolesbadges.json")
-        self.roles_data = self.load_roles_data()
-        self.server_data_path = data_path("JSON/server.json")
-        self.verification_file_path = data_path("JSON/verification_codes.json")
-        self.server_data = self.load_server_data()
+        self.backend = get_backend()
+        self.store = get_verified_store()
+        self.habbo_api = get_habbo_client(bot)
+        self.verified_role_id = 1277489459226738808  # Replace with actual Verified role ID
+        self.awaiting_verification_role_id = 1248310200939581594  # Replace with actual Role ID to remove
         self.verification_data = self.load_verification_codes()
-        self.cleanup_task.start()
-
-    def load_roles_data(self):
-        if os.path.exists(self.roles_file_path):
-            try:
-                with open(self.roles_file_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    roles_data = data.get("roles", {})
-                    if not isinstance(roles_data, dict):
-                        raise ValueError("The 'roles' key must contain a dictionary.")
-                    self.validate_roles_data(roles_data)
-                    return roles_data
-            except json.JSONDecodeError:
-                print(f"Error decoding {self.roles_file_path}. Ensure it's valid JSON.")
-                return {}
-        else:
-            print(f"{self.roles_file_path} not found.")
-            return {}
+        # (deadline, user_id) for every pending code; stale entries are skipped when popped
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._expiry_wake = asyncio.Event()
+        for user_id, entry in self.verification_data["verification_data"].items():
+            self.schedule_expiry(user_id, entry)
+        self.expiry_task.start()
+        self.roles_watch_task.start()
+        self.motto_poll_task.start()
+
+    async def cog_unload(self):
+        self.expiry_task.cancel()
+        self.motto_poll_task.cancel()
+        self.roles_watch_task.cancel()
+        await self.backend.flush()
 
     def validate_roles_data(self, roles_data):
-        if not isinstance(roles_data, dict):
-            raise ValueError("roles_data must be a dictionary.")
-        for key in ["EmployeeRoles", "DonatorRoles", "Misc", "SpecialUnits"]:
-            if key not in roles_data:
-                raise ValueError(f"Missing expected key: '{key}' in roles_data.")
-            if not isinstance(roles_data[key], list):
-                raise ValueError(f"'{key}' must be a list of roles.")
-
-    def load_server_data(self):
-        if os.path.exists(self.server_data_path):
-            try:
-                with open(self.server_data_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    if "verified_users" not in data:
-                        data["verified_users"] = []
-                    if "channels" not in data:
-                        data["channels"] = {
-                            "verification": None
-                        }
-                    return data
-            except json.JSONDecodeError:
-                print(f"Error decoding {self.server_data_path}. Ensure it's valid JSON.")
-                return {"verified_users": [], "channels": {"verification": None}}
-        return {"verified_users": [], "channels": {"verification": None}}
-
-    def save_server_data(self):
-        with open(self.server_data_path, "w", encoding="utf-8") as file:
-            json.dump(self.server_data, file, indent=4)
+        validate_roles_data(roles_data)
+
+    @tasks.loop(seconds=ROLES_POLL_INTERVAL)
+    async def roles_watch_task(self):
+        """Hot-reload rolesbadges.json for every consumer when it changes on disk."""
+        reload_if_changed(validator=self.validate_roles_data)
 
     def load_verification_codes(self):
-        if os.path.exists(self.verification_file_path):
-            try:
-                with open(self.verification_file_path, "r", encoding="utf-8") as file:
-                    return json.load(file)
-            except json.JSONDecodeError:
-                print(f"Error decoding {self.verification_file_path}. Ensure it's valid JSON.")
-                return {"verification_data": {}}
-        return {"verification_data": {}}
-
-    def save_verification_codes(self):
-        with open(self.verification_file_path, "w", encoding="utf-8") as file:
-            json.dump(self.verification_data, file, indent=4)
-
-    @tasks.loop(minutes=2.5)
-    async def cleanup_task(self):
-        current_time = time.time()
-        expired_keys = [
-            user_id for user_id, data in self.verification_data["verification_data"].items()
-            if current_time - data['timestamp'] > 600
+        data = self.backend.load_verification_codes()
+        data.setdefault("verification_data", {})
+        return data
+
+    def schedule_expiry(self, user_id: str, entry: dict) -> None:
+        deadline = entry["timestamp"] + CODE_TTL
+        heapq.heappush(self._expiry_heap, (deadline, user_id))
+        if self._expiry_heap[0] == (deadline, user_id):
+            self._expiry_wake.set()  # new earliest deadline
+
+    @tasks.loop()
+    async def expiry_task(self):
+        """Sleep until the next code's deadline, then drop every code that has expired."""
+        timeout = self._expiry_heap[0][0] - time.time() if self._expiry_heap else None
+        try:
+            await asyncio.wait_for(self._expiry_wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._expiry_wake.clear()
+
+        now = time.time()
+        pending = self.verification_data["verification_data"]
+        expired_keys = []
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            _, user_id = heapq.heappop(self._expiry_heap)
+            entry = pending.get(user_id)
+            # The code may have been completed or replaced since it was scheduled
+            if entry is not None and entry["timestamp"] + CODE_TTL <= now:
+                del pending[user_id]
+                expired_keys.append(user_id)
+        if expired_keys:
+            self.backend.delete_verification_codes(self.verification_data, expired_keys)
+
+    @tasks.loop(seconds=MOTTO_POLL_INTERVAL)
+    async def motto_poll_task(self):
+        """Check every pending code's motto in one bounded batch and auto-complete matches."""
+        pending = [
+            (user_id, dict(entry)) for user_id, entry in self.verification_data["verification_data"].items()
+            if entry.get("guild_id")
         ]
-        for key in expired_keys:
-            del self.verification_data["verification_data"][key]
-        self.save_verification_codes()
+        if not pending:
+            return
+        semaphore = asyncio.Semaphore(MOTTO_POLL_CONCURRENCY)
+
+        async def check(user_id, entry):
+            async with semaphore:
+                json_data = await self.habbo_api.get_user(entry["habbo"], fresh=True)
+            motto = (json_data or {}).get("motto") or ""
+            if entry["code"] not in motto:
+                return
+            guild = self.bot.get_guild(entry["guild_id"])
+            member = guild.get_member(int(user_id)) if guild else None
+            if member is None:
+                return
+            if not self.claim_verification(user_id, entry["habbo"], json_data):
+                return
+            embed = discord.Embed(
+                title="Verification Successful",
+                description=(f"We found your code in your motto.\n"
+                             f"**Habbo:** `{json_data.get('name')}`\n**Verified:** \u2705"),
+                color=discord.Color.green()
+            )
+            # The code is claimed; a failed DM must not skip roles and nickname
+            try:
+                await member.send(embed=embed)
+            except discord.Forbidden:
+                print(f"Could not DM user {member.id}. They may have DMs disabled.")
+            except discord.HTTPException as e:
+                print(f"Could not DM user {member.id}: {e}")
+            await self.run_post_verification(guild, member, entry["habbo"], json_data)
+
+        results = await asyncio.gather(*(check(user_id, entry) for user_id, entry in pending), return_exceptions=True)
+        for (user_id, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                print(f"[HabboVerify] Motto poll failed for {user_id}: {result}")
+
+    @motto_poll_task.before_loop
+    async def before_motto_poll_task(self):
+        await self.bot.wait_until_ready()
 
     def generate_unique_code(self):
         return ''.join(random.choices(string.ascii_letters + string.digits, k=5))
 
 
-    async def assign_roles(self, member, groups_data, guild):
-        ic_role_id = 1249819550015426571
-        cdaemployee_role_id = 1248313244481884220
-
-        roles_data = self.roles_data
-
-        ic_role = guild.get_role(ic_role_id)
-        cdaemployee_role = guild.get_role(cdaemployee_role_id)
-
-        added_roles = []
-        removed_roles = []
-
-        # Process EmployeeRoles
-        employee_roles = roles_data.get("EmployeeRoles", [])
-        highest_employee_role = None
-
-        for role_data in employee_roles:
-            for group in groups_data:
-                if role_data.get("group_id") == group.get("id"):
-                    highest_employee_role = role_data
-                    break
-            if highest_employee_role:
-                break
-
-        for role_data in employee_roles:
-            role = guild.get_role(role_data.get("role_id"))
-            if role and role in member.roles:
-                try:
-                    await member.remove_roles(role)
-                    removed_roles.append(role.name)
-                except discord.Forbidden:
-                    pass
-
-        if highest_employee_role:
-            role = guild.get_role(highest_employee_role.get("role_id"))
-            if role and role not in member.roles:
-                try:
-                    await member.add_roles(role)
-                    added_roles.append(role.name)
-                except discord.Forbidden:
-                    pass
-
-        if highest_employee_role:
-            if highest_employee_role.get("iC") == "yes" and ic_role and ic_role not in member.roles:
-                try:
-                    await member.add_roles(ic_role)
-                    added_roles.append(ic_role.name)
-                except discord.Forbidden:
-                    pass
-            if highest_employee_role.get("cdaemployee") == "yes" and cdaemployee_role and cdaemployee_role not in member.roles:
-                try:
-                    await member.add_roles(cdaemployee_role)
-                    added_roles.append(cdaemployee_role.name)
-                except discord.Forbidden:
-                    pass
-
-        for category in ["DonatorRoles", "Misc", "SpecialUnits"]:
-            for role_data in roles_data.get(category, []):
-                for group in groups_data:
-                    if role_data.get("group_id") == group.get("id"):
-                        role = guild.get_role(role_data.get("role_id"))
-                        if role and role not in member.roles:
-                            try:
-                                await member.add_roles(role)
-                                added_roles.append(role.name)
-                            except discord.Forbidden:
-                                pass
-
-        return added_roles, removed_roles
-
-    async def send_roles_message(self, interaction: discord.Interaction, habbo: str):
-        general_channel_id = self.server_data["channels"].get("general")
-        general_channel = interaction.guild.get_channel(general_channel_id)
+    def claim_verification(self, user_id: str, habbo: str, json_data: dict) -> bool:
+        """Mark a pending code as completed and record the verified user.
+
+        Returns False if the code was already completed elsewhere, so /verify
+        and the motto poller can't both complete the same user.
+        """
+        if self.verification_data["verification_data"].pop(user_id, None) is None:
+            return False
+        self.store.add(user_id, habbo, unique_id=json_data.get("uniqueId"), hotel=DEFAULT_HOTEL)
+        self.backend.delete_verification_codes(self.verification_data, [user_id])
+        return True
+
+    async def run_post_verification(self, guild, user, habbo: str, json_data: dict):
+        """Log, rename, assign roles and welcome a newly verified user, concurrently.
+
+        Nickname, Verified/Awaiting and group roles go out as one member edit.
+        Every failure is collected and reported in a single log line.
+        """
+        habbo_name = json_data.get("name")
+        member = guild.get_member(user.id)
+        avatar_url = f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
+
+        async def log_to(channel_key, title, color):
+            channel = guild.get_channel(self.store.channels.get(channel_key))
+            if not channel:
+                return
+            embed = discord.Embed(
+                title=title,
+                description=(f"**User:** {user.mention}\n"
+                             f"**Habbo:** `{habbo_name}`\n"
+                             f"**Verified:** \u2705"),
+                color=color
+            )
+            embed.set_thumbnail(url=avatar_url)
+            await channel.send(embed=embed)
+
+        async def update_member():
+            if not member:
+                return
+            roles_to_add, roles_to_remove = {self.verified_role_id}, {self.awaiting_verification_role_id}
+            habbo_id = json_data.get("uniqueId")
+            if habbo_id:
+                groups_data = await self.habbo_api.get_groups(habbo_id)
+                if groups_data is not None:
+                    group_add, group_remove = get_role_resolver().diff(
+                        (role.id for role in member.roles), groups_data, json_data.get("motto") or ""
+                    )
+                    roles_to_add |= group_add
+                    roles_to_remove |= group_remove
+            await apply_role_diff(
+                member, roles_to_add, roles_to_remove - roles_to_add,
+                reason="User is verified", nick=habbo_name or None,
+            )
+
+        steps = {
+            "verification log": log_to("verification", "User Verified", discord.Color.green()),
+            "banlogs log": log_to("banlogs", "Verification Log", discord.Color.blue()),
+            "member update": update_member(),
+            "welcome message": self.send_roles_message(guild, user, habbo),
+        }
+        results = await asyncio.gather(*steps.values(), return_exceptions=True)
+        failures = [f"{name}: {result!r}" for name, result in zip(steps, results) if isinstance(result, Exception)]
+        if failures:
+            print(f"[HabboVerify] Post-verification issues for {user} ({habbo}): " + "; ".join(failures))
+
+    async def send_roles_message(self, guild: discord.Guild, user: discord.abc.User, habbo: str):
+        general_channel_id = self.store.channels.get("general")
+        general_channel = guild.get_channel(general_channel_id)
 
         if not general_channel:
             print(f"General channel with ID {general_channel_id} not found.")
@@ -195,7 +227,7 @@ class HabboVerifyCog(commands.Cog):
         # Send the message into the general channel with automatic deletion
         try:
             await general_channel.send(
-                content=f"{interaction.user.mention}!",
+                content=f"{user.mention}!",
                 embed=embed,
                 delete_after=600
             )
@@ -213,24 +245,20 @@ class HabboVerifyCog(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
             user_id = str(interaction.user.id)
-            verification_channel_id = self.server_data["channels"].get("verification")
-            banlogs_channel_id = self.server_data["channels"].get("banlogs")
-            verified_role_id = 1277489459226738808  # Replace with actual Verified role ID
-            role_to_remove_id = 1248310200939581594  # Replace with actual Role ID to remove
 
             # Check if the user is already verified
-            for verified_user in self.server_data["verified_users"]:
-                if verified_user["user_id"] == user_id:
-                    embed = discord.Embed(
-                        title="Already Verified \u2705",
-                        description=f"**Verified:** `{verified_user['habbo']}`",
-                        color=discord.Color.green()
-                    )
-                    embed.set_thumbnail(
-                        url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
-                    )
-                    await interaction.followup.send(embed=embed, ephemeral=True)
-                    return
+            verified_user = self.store.get(user_id)
+            if verified_user:
+                embed = discord.Embed(
+                    title="Already Verified \u2705",
+                    description=f"**Verified:** `{verified_user['habbo']}`",
+                    color=discord.Color.green()
+                )
+                embed.set_thumbnail(
+                    url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
+                )
+                await interaction.followup.send(embed=embed, ephemeral=True)
+                return
 
             # Check for ongoing verification
             if user_id in self.verification_data["verification_data"]:
@@ -251,125 +279,53 @@ class HabboVerifyCog(commands.Cog):
                     return
 
                 # Validate the Habbo motto
-                url = f"https://www.habbo.com/api/public/users?name={habbo}"
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url) as response:
-                        if response.status == 200:
-                            json_data = await response.json()
-                            motto = json_data.get("motto")
-                            habbo_name = json_data.get("name")
-
-                            if motto and verification_code in motto:
-                                # User verified successfully
-                                self.server_data["verified_users"].append({
-                                    "user_id": user_id,
-                                    "habbo": habbo
-                                })
-                                del self.verification_data["verification_data"][user_id]
-                                self.save_server_data()
-                                self.save_verification_codes()
-
-                                guild = interaction.guild
-                                verification_channel = guild.get_channel(verification_channel_id)
-                                banlogs_channel = guild.get_channel(banlogs_channel_id)
-                                member = guild.get_member(interaction.user.id)
-                                verified_role = guild.get_role(verified_role_id)
-                                role_to_remove = guild.get_role(role_to_remove_id)
-
-                                # Send a message to the verification channel
-                                if verification_channel:
-                                    embed = discord.Embed(
-                                        title="User Verified",
-                                        description=(f"**User:** {interaction.user.mention}\n"
-                                                     f"**Habbo:** `{habbo_name}`\n"
-                                                     f"**Verified:** \u2705"),
-                                        color=discord.Color.green()
-                                    )
-                                    embed.set_thumbnail(
-                                        url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
-                                    )
-                                    await verification_channel.send(embed=embed)
-
-                                # Log verification success in the banlogs channel
-                                if banlogs_channel:
-                                    embed = discord.Embed(
-                                        title="Verification Log",
-                                        description=(f"**User:** {interaction.user.mention}\n"
-                                                     f"**Habbo:** `{habbo_name}`\n"
-                                                     f"**Verified:** \u2705"),
-                                        color=discord.Color.blue()
-                                    )
-                                    embed.set_thumbnail(
-                                        url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
-                                    )
-                                    await banlogs_channel.send(embed=embed)
-
-                                # Update the user's nickname
-                                if member and habbo_name:
-                                    try:
-                                        await member.edit(nick=habbo_name)
-                                    except discord.Forbidden:
-                                        pass  # Ignore permission errors
-
-                                # Assign the verified role
-                                if member and verified_role:
-                                    try:
-                                        await member.add_roles(verified_role)
-                                    except discord.Forbidden:
-                                        pass
-
-                                # Remove the specified role
-                                if member and role_to_remove:
-                                    try:
-                                        await member.remove_roles(role_to_remove)
-                                    except discord.Forbidden:
-                                        pass
-                                        
-                                if member:
-                                    async with aiohttp.ClientSession() as session:
-                                        user_url = f"https://www.habbo.com/api/public/users?name={habbo}"
-                                        async with session.get(user_url) as user_response:
-                                            if user_response.status == 200:
-                                                user_data = await user_response.json()
-                                                habbo_id = user_data.get("uniqueId")  # Get unique Habbo ID
-                                                
-                                                # Fetch the groups data to assign roles automatically
-                                                groups_url = f"https://www.habbo.com/api/public/users/{habbo_id}/groups"
-                                                async with session.get(groups_url) as groups_response:
-                                                    if groups_response.status == 200:
-                                                        groups_data = await groups_response.json()
-                                                        
-                                                        # Call assign_roles function to apply roles automatically
-                                                        added_roles, removed_roles = await self.assign_roles(member, groups_data, guild)
-
-                                # Notify the user of successful verification
-                                embed = discord.Embed(
-                                    title="Verification Successful",
-                                    description=(f"**Habbo:** `{habbo_name}`\n**Verified:** \u2705"),
-                                    color=discord.Color.green()
-                                )
-                                embed.set_thumbnail(
-                                    url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
-                                )
-                                await interaction.followup.send(embed=embed, ephemeral=True)
-                                # After successful verification
-                                await self.send_roles_message(interaction, habbo)
-                                return
-                            else:
-                                # Verification failed due to missing code in motto
-                                embed = discord.Embed(
-                                    title="Verification Failed",
-                                    description=(f"Your motto does not contain the verification code.\n"
-                                                 f"## `{verification_code}`\n"
-                                                 "Please ensure your motto contains the correct code and try again."),
-                                    color=discord.Color.red()
-                                )
-                                embed.set_thumbnail(
-                                    url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
-                                )
-                                await interaction.followup.send(embed=embed, ephemeral=True)
-                                return
+                json_data = await self.habbo_api.get_user(habbo, fresh=True)
+                if json_data:
+                    motto = json_data.get("motto")
+                    habbo_name = json_data.get("name")
+
+                    if motto and verification_code in motto:
+                        # User verified successfully
+                        completed = self.claim_verification(user_id, habbo, json_data)
+
+                        # Not claimed and not stored: the code expired during the lookup
+                        if not completed and self.store.get(user_id) is None:
+                            embed = discord.Embed(
+                                title="Verification Expired",
+                                description=("Your verification code expired before it could be checked.\n"
+                                             "Please run `/verify` again to get a new code."),
+                                color=discord.Color.red()
+                            )
+                            await interaction.followup.send(embed=embed, ephemeral=True)
+                            return
+
+                        # Notify the user first, then run the side effects together
+                        embed = discord.Embed(
+                            title="Verification Successful",
+                            description=(f"**Habbo:** `{habbo_name}`\n**Verified:** \u2705"),
+                            color=discord.Color.green()
+                        )
+                        embed.set_thumbnail(
+                            url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
+                        )
+                        await interaction.followup.send(embed=embed, ephemeral=True)
+                        if completed:
+                            await self.run_post_verification(interaction.guild, interaction.user, habbo, json_data)
+                        return
+                    else:
+                        # Verification failed due to missing code in motto
+                        embed = discord.Embed(
+                            title="Verification Failed",
+                            description=(f"Your motto does not contain the verification code.\n"
+                                         f"## `{verification_code}`\n"
+                                         "Please ensure your motto contains the correct code and try again."),
+                            color=discord.Color.red()
+                        )
+                        embed.set_thumbnail(
+                            url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
+                        )
+                        await interaction.followup.send(embed=embed, ephemeral=True)
+                        return
 
             # Generate a new verification code if none exists
             verification_code = self.generate_unique_code()
@@ -377,15 +333,20 @@ class HabboVerifyCog(commands.Cog):
                 "code": verification_code,
                 "habbo": habbo,
                 "timestamp": time.time(),
+                "guild_id": interaction.guild_id,
             }
-            self.save_verification_codes()
+            self.backend.upsert_verification_code(
+                self.verification_data, user_id, self.verification_data["verification_data"][user_id]
+            )
+            self.schedule_expiry(user_id, self.verification_data["verification_data"][user_id])
 
             await send_welcome_dm(interaction.user, habbo)
 
             verify_embed = discord.Embed(
                 title="Verify Your Habbo Account",
                 description=(
-                    "Add the code below to your Habbo motto, then run **`/verify`** again.\n"
+                    "Add the code below to your Habbo motto. We check it automatically, "
+                    "or run **`/verify`** again.\n"
                     f"## `{verification_code}`\n"
                     "If you entered the wrong Habbo name, wait up to 5 minutes and retry."
                 ),
@@ -1,176 +1,432 @@
+import asyncio
+import csv
 import discord
-from discord import app_commands
-from discord.ext import commands
-import aiohttp
+import io
 import json
-import os
+import time
+from discord import app_commands
+from discord.ext import commands, tasks
 from COGS.BotCheck import has_authorised_role
-from COGS.paths import data_path
+from COGS.habbo_api import DEFAULT_HOTEL, get_habbo_client
+from COGS.member_events import MemberChange, get_member_dispatcher
+from COGS.punishment_index import PunishmentIndex
+from COGS.storage import PUNISHMENT_LISTS, get_backend
+from COGS.verified_store import get_verified_store
+
+BAN_SWEEP_CONCURRENCY = 16      # verified members checked in parallel by the ban sweep
+BAN_ENFORCE_DELAY = 2.0         # seconds between bans when a sweep enforces
+BAN_SWEEP_SCHEDULED = False     # also run a report-only sweep every BAN_SWEEP_INTERVAL hours
+BAN_SWEEP_INTERVAL = 6
+IMPORT_MAX_BYTES = 2 * 1024 * 1024   # largest punishment import file accepted
+IMPORT_ERRORS_SHOWN = 10             # invalid rows listed in the import summary
+LOOKUP_DELAY = 1.0                   # seconds between queued uniqueId lookups
 
 
 class BanOnSightCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.verification_file = data_path("JSON/server.json")
-        self.punishment_file = data_path("JSON/punishment.json")
+        self.store = get_verified_store()
+        self.habbo_api = get_habbo_client(bot)
+        self.backend = get_backend()
+        self.guild_id = 1248307521119060028  # Replace with your server's ID
         self.verified_role_id = 1320054879477170299  # Replace with your Verified role ID
+        self.enforce_task: asyncio.Task | None = None
+        self.lookup_tasks: set[asyncio.Task] = set()
         self.load_data()
+        self.agency_refresh_task.start()
+        self.member_subscription = get_member_dispatcher(bot).subscribe(
+            "BanOnSight", self.on_verified_role_added, role_ids={self.verified_role_id}
+        )
+        if BAN_SWEEP_SCHEDULED:
+            self.scheduled_ban_sweep.start()
 
     def load_data(self):
-        """Load verification and punishment data."""
-        if os.path.exists(self.verification_file):
-            with open(self.verification_file, "r", encoding="utf-8") as file:
-                self.verification_data = json.load(file)
-        else:
-            self.verification_data = {"verified_users": [], "channels": {}}
-
-        if os.path.exists(self.punishment_file):
-            with open(self.punishment_file, "r", encoding="utf-8") as file:
-                self.punishment_data = json.load(file)
-        else:
-            self.punishment_data = {"banned_users": {"BoS": {}, "DNH": {}, "NP": {}}, "banned_groups": []}
+        """Load punishment data."""
+        self.punishment_data = self.backend.load_punishments()
 
         # Ensure banned_users structure exists
         self.punishment_data.setdefault("banned_users", {})
-        for category in ["BoS", "DNH", "NP"]:
+        self.punishment_data.setdefault("banned_groups", [])
+        for category in PUNISHMENT_LISTS:
             self.punishment_data["banned_users"].setdefault(category, {})
-
-    def save_punishment_data(self):
-        """Save punishment data back to the file."""
-        with open(self.punishment_file, "w", encoding="utf-8") as file:
-            json.dump(self.punishment_data, file, indent=4)
-
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        before_roles = set(before.roles)
-        after_roles = set(after.roles)
-
-        # Check if a verified role is added
-        verified_role = discord.utils.get(after.guild.roles, id=self.verified_role_id)
-        if verified_role and verified_role not in before_roles and verified_role in after_roles:
+        self.index = PunishmentIndex(self.punishment_data)
+
+    async def cog_unload(self):
+        get_member_dispatcher(self.bot).unsubscribe(self.member_subscription)
+        self.agency_refresh_task.cancel()
+        self.scheduled_ban_sweep.cancel()
+        if self.enforce_task is not None:
+            self.enforce_task.cancel()
+        for task in self.lookup_tasks:
+            task.cancel()
+        await self.backend.flush()
+
+    def set_punishment(self, list_type: str, habbo: str, entry: dict) -> None:
+        """Add/replace one punishment in the document, the index and the backend."""
+        users = self.punishment_data["banned_users"].setdefault(list_type, {})
+        if habbo in users:
+            self.index.remove(list_type, habbo, users[habbo])
+        users[habbo] = entry
+        self.index.add(list_type, habbo, entry)
+        self.backend.upsert_punishment(self.punishment_data, list_type, habbo, entry)
+
+    def delete_punishment(self, list_type: str, habbo: str) -> None:
+        entry = self.punishment_data["banned_users"].get(list_type, {}).pop(habbo, None)
+        self.index.remove(list_type, habbo, entry)
+        self.backend.delete_punishment(self.punishment_data, list_type, habbo)
+
+    def resolve_agencies(self) -> int:
+        """Fill in group IDs for banned agencies whose group has been seen; returns how many."""
+        resolved = 0
+        for group in self.punishment_data["banned_groups"]:
+            if group.get("badge_id"):
+                continue
+            group_id = self.habbo_api.find_group_id(group["name"])
+            if group_id:
+                group["badge_id"] = group_id
+                self.backend.upsert_banned_group(self.punishment_data, group)
+                resolved += 1
+        if resolved:
+            self.index.set_groups(self.punishment_data["banned_groups"])
+        return resolved
+
+    @tasks.loop(minutes=30)
+    async def agency_refresh_task(self):
+        """Periodically resolve banned agencies added by name only."""
+        resolved = self.resolve_agencies()
+        if resolved:
+            print(f"[BanOnSight] Resolved {resolved} banned agencies to Habbo group IDs.")
+
+    async def attach_unique_id(self, list_type: str, habbo: str) -> bool:
+        """Record the Habbo uniqueId on a punishment so it survives renames.
+
+        Updates the document and index only; the caller persists. Returns
+        True if the entry changed.
+        """
+        profile = await self.habbo_api.get_user(habbo)
+        unique_id = (profile or {}).get("uniqueId")
+        entry = self.punishment_data["banned_users"].get(list_type, {}).get(habbo)
+        if not unique_id or entry is None or entry.get("unique_id") == unique_id:
+            return False
+        self.index.remove(list_type, habbo, entry)
+        entry["unique_id"] = unique_id
+        self.index.add(list_type, habbo, entry)
+        return True
+
+    def queue_unique_ids(self, keys: list[tuple[str, str]]) -> None:
+        """Attach uniqueIds to (list_type, habbo) entries in the background, keeping the task until it finishes."""
+        task = asyncio.create_task(self._attach_unique_ids(keys))
+        self.lookup_tasks.add(task)
+        task.add_done_callback(self.lookup_tasks.discard)
+
+    async def _attach_unique_ids(self, keys: list[tuple[str, str]]) -> None:
+        """Resolve ``keys`` one at a time, then persist everything that changed in one write."""
+        changed = []
+        try:
+            for number, (list_type, habbo) in enumerate(keys):
+                if number:
+                    await asyncio.sleep(LOOKUP_DELAY)
+                try:
+                    if await self.attach_unique_id(list_type, habbo):
+                        changed.append((list_type, habbo))
+                except Exception as e:
+                    print(f"[BanOnSight] uniqueId lookup failed for {habbo} ({list_type}): {e}")
+        finally:
+            # Also runs on cancellation, so lookups already done are not lost
+            if len(changed) == 1:
+                list_type, habbo = changed[0]
+                entry = self.punishment_data["banned_users"].get(list_type, {}).get(habbo)
+                if entry is not None:
+                    self.backend.upsert_punishment(self.punishment_data, list_type, habbo, entry)
+            elif changed:
+                self.backend.save_punishments(self.punishment_data)
+
+    async def find_violations(self, verified_user: dict, label: str = ""):
+        """Return (banned_lists, matched_banned_groups) for a verified user entry."""
+        habbo_name = verified_user.get("habbo")
+        hotel = verified_user.get("hotel", DEFAULT_HOTEL)
+        matched_banned_groups = []
+
+        habbo_id = await self.store.ensure_unique_id(verified_user, self.habbo_api)
+
+        # Check banned lists by name (any capitalisation) and by uniqueId (survives renames)
+        banned_lists = self.index.lists_for(habbo_name, habbo_id)
+        if banned_lists:
+            print(f"User {label} is on the banned lists: {banned_lists}")
+
+        if not habbo_id:
+            print(f"Habbo ID not found for user: {habbo_name}")
+        else:
+            # Fetch Habbo user groups and check them against the banned groups
+            groups_data = await self.habbo_api.get_groups(habbo_id, hotel)
+            if groups_data is None:
+                print(f"Failed to fetch groups for user {habbo_name}.")
+            else:
+                # This fetch may have revealed the group of an agency banned by name
+                self.resolve_agencies()
+                user_group_ids = {group.get("id") for group in groups_data if isinstance(group, dict)}
+                matched_ids = self.index.banned_group_ids & user_group_ids
+                matched_banned_groups = [
+                    group for group in groups_data
+                    if isinstance(group, dict) and group.get("id") in matched_ids
+                ]
+        return banned_lists, matched_banned_groups
+
+    async def ban_member(self, member: discord.Member, banned_lists: list, matched_banned_groups: list):
+        """DM, ban and log a member who is on a banned list or in a banned group."""
+        reasons = []
+        if banned_lists:
+            reasons.append(f"You are currently on: **{', '.join(banned_lists)}**")
+        if matched_banned_groups:
+            reasons.append("You are currently in a banned group.\n Please leave the group - Speak to a member of Foundation with CDA for reconsideration")
+
+        reason = " | ".join(reasons)
+
+        # Notify user via DM
+        try:
+            embed = discord.Embed(
+                title="Banned From The CDA Server",
+                description=(
+                    f"**Reason:** \n{reason}\n"
+                    "If you believe this is a mistake, or would like to **appeal**, please contact the Foundation team."
+                ),
+                color=discord.Color.red()
+            )
+            embed.set_footer(text="Automatic Ban Notification")
+            await member.send(embed=embed)
+        except discord.Forbidden:
+            print(f"Could not DM user {member.name}. They may have DMs disabled.")
+
+        # Ban the user
+        try:
+            await member.guild.ban(member, reason=reason)
+            log_channel_id = self.store.channels.get("botlogs")
+            if log_channel_id:
+                log_channel = member.guild.get_channel(log_channel_id)
+                if log_channel:
+                    embed = discord.Embed(
+                        title="Automated Ban",
+                        description=(
+                            f"**User:** {member.mention}\n"
+                            f"**Reason:** {reason}"
+                        ),
+                        color=discord.Color.red()
+                    )
+                    await log_channel.send(embed=embed)
+            return True
+        except discord.Forbidden:
+            print(f"Failed to ban user {member.name} due to lack of permissions.")
+            return False
+
+    async def on_verified_role_added(self, change: MemberChange):
+        after = change.after
+        # Check if the verified role was added
+        if self.verified_role_id in change.added_role_ids:
             user_id = str(after.id)
 
-            # Debug: Log available verification data
-            print(f"Verification data loaded: {self.verification_data.get('verified_users', [])}")
-
             # Fetch verification data
-            verified_user = next(
-                (user for user in self.verification_data.get("verified_users", []) if user["user_id"] == user_id), None
-            )
+            verified_user = self.store.get(user_id)
             if not verified_user:
                 print(f"No verification data found for user {after.name} (user_id: {user_id}).")
                 return
 
-            habbo_name = verified_user.get("habbo")
-            hotel = verified_user.get("hotel", "com")
-
-            if not habbo_name:
+            if not verified_user.get("habbo"):
                 print(f"No Habbo username found for user {after.name}.")
                 return
 
-            # Check banned lists
-            banned_lists = []
-            for list_type, users in self.punishment_data.get("banned_users", {}).items():
-                if habbo_name in users:
-                    banned_lists.append(list_type)
-
-            if banned_lists:
-                print(f"User {after.name} (user_id: {user_id}) is on the banned lists: {banned_lists}")
-
-            # Fetch Habbo API data
-            habbo_user_url = f"https://www.habbo.{hotel}/api/public/users?name={habbo_name}"
-            habbo_groups_url_template = f"https://www.habbo.com/api/public/users/{{}}/groups"
-            matched_banned_groups = []
-
-            async with aiohttp.ClientSession() as session:
-                try:
-                    # Fetch Habbo user details
-                    async with session.get(habbo_user_url) as user_response:
-                        if user_response.status != 200:
-                            print(f"Failed to fetch user info for {habbo_name}. Status: {user_response.status}")
-                            return
-
-                        user_data = await user_response.json()
-                        habbo_id = user_data.get("uniqueId")
-                        if not habbo_id:
-                            print(f"Habbo ID not found for user: {habbo_name}")
-                            return
-
-                    # Fetch Habbo user groups
-                    habbo_groups_url = habbo_groups_url_template.format(habbo_id)
-                    async with session.get(habbo_groups_url) as groups_response:
-                        if groups_response.status != 200:
-                            print(f"Failed to fetch groups for user {habbo_name}. Status: {groups_response.status}")
-                            return
-
-                        groups_data = await groups_response.json()
-
-                    # Check groups against banned list
-                    banned_group_ids = {group["badge_id"] for group in self.punishment_data["banned_groups"]}
-                    matched_banned_groups = [
-                        group for group in groups_data if group.get("id") in banned_group_ids
-                    ]
-
-                except Exception as e:
-                    print(f"Error during Habbo group check: {str(e)}")
+            banned_lists, matched_banned_groups = await self.find_violations(
+                verified_user, f"{after.name} (user_id: {user_id})"
+            )
 
             # Ban the user if they are on banned lists or in banned groups
             if banned_lists or matched_banned_groups:
-                reasons = []
-                if banned_lists:
-                    reasons.append(f"You are currently on: **{', '.join(banned_lists)}**")
-                if matched_banned_groups:
-                    reasons.append("You are currently in a banned group.\n Please leave the group - Speak to a member of Foundation with CDA for reconsideration")
+                await self.ban_member(after, banned_lists, matched_banned_groups)
 
-                reason = " | ".join(reasons)
+    async def run_ban_sweep(self, guild: discord.Guild):
+        """Check every verified member of ``guild``; returns (hits, counts, elapsed seconds).
 
-                # Notify user via DM
-                try:
-                    embed = discord.Embed(
-                        title="Banned From The CDA Server",
-                        description=(
-                            f"**Reason:** \n{reason}\n"
-                            "If you believe this is a mistake, or would like to **appeal**, please contact the Foundation team."
-                        ),
-                        color=discord.Color.red()
-                    )
-                    embed.set_footer(text="Automatic Ban Notification")
-                    await after.send(embed=embed)
-                except discord.Forbidden:
-                    print(f"Could not DM user {after.name}. They may have DMs disabled.")
+        Each hit is (member, verified_user, banned_lists, matched_banned_groups).
+        """
+        semaphore = asyncio.Semaphore(BAN_SWEEP_CONCURRENCY)
+        counts = {"checked": 0, "not_in_guild": 0, "no_habbo": 0, "failed": 0}
+        hits = []
 
-                # Ban the user
+        async def check(verified_user):
+            member = guild.get_member(int(verified_user["user_id"]))
+            if member is None:
+                counts["not_in_guild"] += 1
+                return
+            if not verified_user.get("habbo"):
+                counts["no_habbo"] += 1
+                return
+            async with semaphore:
                 try:
-                    await after.guild.ban(after, reason=reason)
-                    log_channel_id = self.verification_data["channels"].get("botlogs")
-                    if log_channel_id:
-                        log_channel = after.guild.get_channel(log_channel_id)
-                        if log_channel:
-                            embed = discord.Embed(
-                                title="Automated Ban",
-                                description=(
-                                    f"**User:** {after.mention}\n"
-                                    f"**Reason:** {reason}"
-                                ),
-                                color=discord.Color.red()
-                            )
-                            await log_channel.send(embed=embed)
-                except discord.Forbidden:
-                    print(f"Failed to ban user {after.name} due to lack of permissions.")
+                    banned_lists, matched_groups = await self.find_violations(
+                        verified_user, f"{member.name} (user_id: {member.id})"
+                    )
+                except Exception as e:
+                    counts["failed"] += 1
+                    print(f"[BanOnSight] Ban sweep check failed for {member.name}: {e}")
+                    return
+            counts["checked"] += 1
+            if banned_lists or matched_groups:
+                hits.append((member, verified_user, banned_lists, matched_groups))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(check(entry) for entry in self.store.entries()))
+        return hits, counts, time.perf_counter() - started
+
+    @staticmethod
+    def ban_sweep_report(hits, counts, elapsed) -> tuple[str, discord.File]:
+        summary = (f"Checked {counts['checked']} verified members in {elapsed:.1f}s "
+                   f"({counts['not_in_guild']} not in server, {counts['no_habbo']} without a Habbo name, "
+                   f"{counts['failed']} failed): {len(hits)} flagged.")
+        lines = [summary, ""]
+        for member, verified_user, banned_lists, matched_groups in hits:
+            groups = ", ".join(group.get("name", group.get("id", "?")) for group in matched_groups)
+            lines.append(
+                f"{member} ({member.id}) [{verified_user['habbo']}]"
+                f" lists: {', '.join(banned_lists) or '-'} | groups: {groups or '-'}"
+            )
+        file = discord.File(io.BytesIO("\n".join(lines).encode("utf-8")), filename=f"bansweep_{int(time.time())}.txt")
+        return summary, file
+
+    async def enforce_ban_sweep(self, hits) -> int:
+        """Ban flagged members one at a time, BAN_ENFORCE_DELAY seconds apart.
+
+        Each member is checked again right before the ban, so anyone removed
+        from the lists or who left a banned group since the sweep is spared.
+        """
+        banned = failed = 0
+        for member, _, _, _ in hits:
+            if member.guild.get_member(member.id) is None:
+                continue
+            verified_user = self.store.get(member.id)
+            if not verified_user or not verified_user.get("habbo"):
+                continue
+            # One member's failure must not end the task and skip everyone after them
+            try:
+                banned_lists, matched_groups = await self.find_violations(
+                    verified_user, f"{member.name} (user_id: {member.id})"
+                )
+                if not banned_lists and not matched_groups:
+                    continue
+                if await self.ban_member(member, banned_lists, matched_groups):
+                    banned += 1
+                else:
+                    failed += 1
+            except Exception as e:
+                failed += 1
+                print(f"[BanOnSight] Ban sweep enforcement failed for {member.name} ({member.id}): {e}")
+            await asyncio.sleep(BAN_ENFORCE_DELAY)
+        print(f"[BanOnSight] Ban sweep enforcement banned {banned}/{len(hits)} flagged members ({failed} failed).")
+        return banned
+
+    @tasks.loop(hours=BAN_SWEEP_INTERVAL)
+    async def scheduled_ban_sweep(self):
+        """Report-only sweep; posts to the botlogs channel when someone is flagged."""
+        guild = self.bot.get_guild(self.guild_id)
+        if not guild:
+            print("[BanOnSight] Scheduled ban sweep: guild not found.")
+            return
+        hits, counts, elapsed = await self.run_ban_sweep(guild)
+        summary, file = self.ban_sweep_report(hits, counts, elapsed)
+        print(f"[BanOnSight] Scheduled ban sweep: {summary}")
+        log_channel = guild.get_channel(self.store.channels.get("botlogs"))
+        if hits and log_channel:
+            await log_channel.send(content=f"**Scheduled Ban Sweep**\n{summary}", file=file)
+
+    @scheduled_ban_sweep.before_loop
+    async def before_scheduled_ban_sweep(self):
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def iter_import_rows(data: bytes, filename: str):
+        """Yield (line_number, row dict) from a CSV or JSON/JSON Lines punishment file."""
+        text = io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+        if filename.lower().endswith(".csv"):
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        first = text.read(1)
+        text.seek(0)
+        if first == "[":
+            for number, row in enumerate(json.load(text), start=1):
+                yield number, row
+            return
+        for number, line in enumerate(text, start=1):
+            if line.strip():
+                yield number, json.loads(line)
+
+    def import_punishments(self, rows) -> dict:
+        """Validate, dedupe and apply punishment rows; one backend save for the whole batch."""
+        lists = {name.upper(): name for name in PUNISHMENT_LISTS}
+        result = {"added": 0, "duplicates": 0, "invalid": []}
+        seen = set()
+        pending = []
+        for number, row in rows:
+            if not isinstance(row, dict):
+                result["invalid"].append(f"row {number}: not an object")
+                continue
+            row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+            habbo = str(row.get("name") or row.get("habbo") or "").strip()
+            list_type = lists.get(str(row.get("list") or "").strip().upper())
+            reason = str(row.get("reason") or "").strip() or "No reason provided"
+            unique_id = str(row.get("unique_id") or "").strip()
+            if not habbo or list_type is None:
+                result["invalid"].append(f"row {number}: needs a name and a list (BoS, DNH or NP)")
+                continue
+            key = (list_type, habbo.casefold())
+            if key in seen or self.index.find(list_type, habbo) is not None:
+                result["duplicates"] += 1
+                continue
+            seen.add(key)
+            entry = {"Reason": reason}
+            if unique_id:
+                entry["unique_id"] = unique_id
+            pending.append((list_type, habbo, entry))
+
+        # Nothing is applied unless the whole file parsed
+        for list_type, habbo, entry in pending:
+            self.punishment_data["banned_users"].setdefault(list_type, {})[habbo] = entry
+            self.index.add(list_type, habbo, entry)
+        if pending:
+            self.backend.save_punishments(self.punishment_data)
+            missing = [(list_type, habbo) for list_type, habbo, entry in pending if "unique_id" not in entry]
+            if missing:
+                self.queue_unique_ids(missing)
+        result["added"] = len(pending)
+        return result
+
+    def export_punishments(self, file_format: str) -> discord.File:
+        buffer = io.StringIO()
+        if file_format == "json":
+            for list_type, users in self.punishment_data["banned_users"].items():
+                for habbo, entry in users.items():
+                    buffer.write(json.dumps({
+                        "name": habbo, "list": list_type,
+                        "reason": entry.get("Reason", ""), "unique_id": entry.get("unique_id", ""),
+                    }) + "\n")
+            filename = "punishments.jsonl"
+        else:
+            writer = csv.writer(buffer)
+            writer.writerow(["name", "list", "reason", "unique_id"])
+            for list_type, users in self.punishment_data["banned_users"].items():
+                for habbo, entry in users.items():
+                    writer.writerow([habbo, list_type, entry.get("Reason", ""), entry.get("unique_id", "")])
+            filename = "punishments.csv"
+        return discord.File(io.BytesIO(buffer.getvalue().encode("utf-8")), filename=filename)
 
     def check_banned_lists(self, user_id: str):
-        banned_lists = []
-        for list_type, users in self.verification_data.get("banned_users", {}).items():
-            if user_id in users:
-                banned_lists.append(list_type)
-        return banned_lists
+        verified_user = self.store.get(user_id)
+        if not verified_user:
+            return []
+        return self.index.lists_for(verified_user.get("habbo"), verified_user.get("unique_id"))
 
     def resolve_habbo_name(self, user_id: str):
         """Resolve the Habbo name from the user ID."""
-        user_data = next(
-            (user for user in self.verification_data.get("verified_users", []) if user["user_id"] == user_id), None
-        )
-        return user_data.get("habbo") if user_data else None
+        return self.store.get_habbo(user_id)
 
     admin = app_commands.Group(name="admin", description="Administrative commands for server management.")
 
@@ -182,6 +438,72 @@ class BanOnSightCog(commands.Cog):
                 embed.add_field(name=field["name"], value=field["value"], inline=field.get("inline", False))
         return embed
 
+    @admin.command(name="bansweep",
+                   description="Check all verified members against the ban lists and banned agencies.")
+    @app_commands.describe(enforce="Also ban flagged members (rate limited). Default: report only.")
+    @has_authorised_role()
+    async def ban_sweep(self, interaction: discord.Interaction, enforce: bool = False):
+        await interaction.response.defer()
+        hits, counts, elapsed = await self.run_ban_sweep(interaction.guild)
+        summary, file = self.ban_sweep_report(hits, counts, elapsed)
+        if enforce and hits:
+            if self.enforce_task is not None and not self.enforce_task.done():
+                summary += "\nNot enforcing: a previous sweep is still banning members."
+            else:
+                summary += f"\nEnforcing: banning {len(hits)} members, one every {BAN_ENFORCE_DELAY:g}s."
+                self.enforce_task = asyncio.create_task(self.enforce_ban_sweep(hits))
+        embed = self.create_embed(
+            title="Ban Sweep",
+            description=summary,
+            color=discord.Color.red() if hits else discord.Color.green()
+        )
+        await interaction.followup.send(embed=embed, file=file)
+
+    @admin.command(name="import",
+                   description="Bulk add BoS/DNH/NP entries from a CSV or JSON file (name, list, reason, unique_id).")
+    @has_authorised_role()
+    async def import_lists(self, interaction: discord.Interaction, file: discord.Attachment):
+        if file.size > IMPORT_MAX_BYTES:
+            await interaction.response.send_message(
+                f"File is too large ({file.size} bytes, limit {IMPORT_MAX_BYTES}).", ephemeral=True
+            )
+            return
+        await interaction.response.defer()
+        try:
+            result = self.import_punishments(self.iter_import_rows(await file.read(), file.filename))
+        except (ValueError, csv.Error) as e:  # json.JSONDecodeError and UnicodeDecodeError are ValueErrors
+            await interaction.followup.send(
+                embed=self.create_embed("Import Failed", f"`{file.filename}` could not be parsed: {e}", discord.Color.red())
+            )
+            return
+        fields = [
+            {"name": "Added", "value": str(result["added"]), "inline": True},
+            {"name": "Already listed", "value": str(result["duplicates"]), "inline": True},
+            {"name": "Invalid", "value": str(len(result["invalid"])), "inline": True},
+        ]
+        if result["invalid"]:
+            fields.append({"name": "Invalid rows", "value": "\n".join(result["invalid"][:IMPORT_ERRORS_SHOWN])[:1024]})
+        embed = self.create_embed(
+            title="Punishment Import",
+            description=f"File: **{file.filename}**",
+            color=discord.Color.green() if result["added"] else discord.Color.orange(),
+            fields=fields
+        )
+        await interaction.followup.send(embed=embed)
+
+    @admin.command(name="export",
+                   description="Export the BoS/DNH/NP lists as a CSV or JSON Lines file.")
+    @app_commands.choices(file_format=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="JSON Lines", value="json"),
+    ])
+    @has_authorised_role()
+    async def export_lists(self, interaction: discord.Interaction, file_format: str = "csv"):
+        total = sum(len(users) for users in self.punishment_data["banned_users"].values())
+        await interaction.response.send_message(
+            content=f"{total} punishment entries.", file=self.export_punishments(file_format)
+        )
+
     @admin.command(name="bos",
                    description="Add a Habbo name to the Ban on Sight (BoS) list with a reason.")
     @has_authorised_role()
@@ -210,18 +532,29 @@ class BanOnSightCog(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
 
-        # Ensure the list exists
-        self.punishment_data["banned_users"].setdefault(list_type, {})
-
-        if habbo_name not in self.punishment_data["banned_users"][list_type]:
-            self.punishment_data["banned_users"][list_type][habbo_name] = {"Reason": reason}
-            self.save_punishment_data()
+        if self.index.find(list_type, habbo_name) is None:
+            fields = [{"name": "Reason", "value": reason, "inline": False}]
+            entry = {"Reason": reason}
+            # Already verified here? Reuse their uniqueId and flag the member.
+            verified_user = self.store.get_by_habbo(habbo_name)
+            if verified_user:
+                if verified_user.get("unique_id"):
+                    entry["unique_id"] = verified_user["unique_id"]
+                member = interaction.guild.get_member(int(verified_user["user_id"])) if interaction.guild else None
+                fields.append({
+                    "name": "Verified Member",
+                    "value": f"<@{verified_user['user_id']}>" + ("" if member else " (not in this server)"),
+                    "inline": False,
+                })
+            self.set_punishment(list_type, habbo_name, entry)
+            if "unique_id" not in entry:
+                self.queue_unique_ids([(list_type, habbo_name)])
 
             embed = self.create_embed(
                 title=f"{list_type} Added",
                 description=f"Habbo: **{habbo_name}** \nPunishment: **{list_type}**",
                 color=discord.Color.green(),
-                fields=[{"name": "Reason", "value": reason, "inline": False}]
+                fields=fields
             )
             embed.set_thumbnail(
                 url=f"https://www.habbo.com/habbo-imaging/avatarimage?user={habbo_name}&direction=3&head_direction=3&gesture=nor&action=wav&size=l"
@@ -256,10 +589,10 @@ class BanOnSightCog(commands.Cog):
 
         formatted_category = valid_categories[category]
 
-        # Check if the Habbo name exists in the category
-        if habbo_name in self.punishment_data["banned_users"].get(formatted_category, {}):
-            del self.punishment_data["banned_users"][formatted_category][habbo_name]
-            self.save_punishment_data()
+        # Check if the Habbo name exists in the category (any capitalisation)
+        stored_name = self.index.find(formatted_category, habbo_name)
+        if stored_name is not None:
+            self.delete_punishment(formatted_category, stored_name)
             embed = self.create_embed(
                 title=f"{formatted_category} Removed",
                 description=f"Habbo: **{habbo_name}**\nRemoved: **{formatted_category}**",
@@ -282,12 +615,9 @@ class BanOnSightCog(commands.Cog):
             await interaction.response.send_message("Invalid list type.")
             return
 
-        # Ensure the list exists
-        self.punishment_data["banned_users"].setdefault(list_type, {})
-
-        if habbo_name not in self.punishment_data["banned_users"][list_type]:
-            self.punishment_data["banned_users"][list_type][habbo_name] = {"Reason": reason}
-            self.save_punishment_data()
+        if self.index.find(list_type, habbo_name) is None:
+            self.set_punishment(list_type, habbo_name, {"Reason": reason})
+            self.queue_unique_ids([(list_type, habbo_name)])
             await interaction.response.send_message(
                 f"Habbo name {habbo_name} has been added to the {list_type} list with reason: {reason}."
             )
@@ -301,7 +631,9 @@ class BanOnSightCog(commands.Cog):
     @banned_agencies.command(name="add",
                              description="Add an agency to the banned agencies list.")
     @has_authorised_role()
-    async def add_agency(self, interaction: discord.Interaction, agency_name: str, reason: str = "No reason provided"):
+    @app_commands.describe(group_id="Habbo group ID (g-hhus-...). Looked up from seen groups if omitted.")
+    async def add_agency(self, interaction: discord.Interaction, agency_name: str, reason: str = "No reason provided",
+                         group_id: str = None):
         banned_groups = self.punishment_data.get("banned_groups", [])
 
         for group in banned_groups:
@@ -314,16 +646,26 @@ class BanOnSightCog(commands.Cog):
                 await interaction.response.send_message(embed=embed, ephemeral=True)
                 return
 
-        # Add the agency to the banned list
-        banned_groups.append({"name": agency_name, "reason": reason})
+        # Add the agency to the banned list, keyed by its Habbo group ID when known
+        group = {"name": agency_name, "reason": reason}
+        group_id = group_id or self.habbo_api.find_group_id(agency_name)
+        if group_id:
+            group["badge_id"] = group_id
+        banned_groups.append(group)
         self.punishment_data["banned_groups"] = banned_groups
-        self.save_punishment_data()
+        self.index.set_groups(banned_groups)
+        self.backend.upsert_banned_group(self.punishment_data, group)
         embed = discord.Embed(
             title="Agency Added",
             description=f"Agency: **{agency_name}**",
             color=discord.Color.dark_red()
         )
         embed.add_field(name="Reason", value=reason, inline=False)
+        embed.add_field(
+            name="Group ID",
+            value=f"`{group_id}`" if group_id else "Not known yet - resolved once a member's groups include it",
+            inline=False
+        )
         await interaction.response.send_message(embed=embed)
 
     @banned_agencies.command(name="remove",
@@ -337,7 +679,8 @@ class BanOnSightCog(commands.Cog):
             if group["name"].lower() == agency_name.lower():
                 banned_groups.remove(group)
                 self.punishment_data["banned_groups"] = banned_groups
-                self.save_punishment_data()
+                self.index.set_groups(banned_groups)
+                self.backend.delete_banned_group(self.punishment_data, group["name"])
                 embed = discord.Embed(
                     title="Agency Removed",
                     description=f"Agency: **{agency_name}**",
@@ -354,6 +697,10 @@ class BanOnSightCog(commands.Cog):
         )
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    @agency_refresh_task.before_loop
+    async def before_agency_refresh_task(self):
+        await self.bot.wait_until_ready()
+
     # Register subgroups under admin
     admin.add_command(banned_agencies)
 
@@ -1,11 +1,11 @@
 import discord
-import json
-import aiohttp
 from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
 
-from COGS.paths import data_path
+from COGS.habbo_api import get_habbo_client
+from COGS.role_resolver import get_role_resolver
+from COGS.verified_store import get_verified_store
 
 # Donator Role Color Mapping (HEX)
 DONATOR_COLORS = {
@@ -19,40 +19,25 @@ DONATOR_COLORS = {
     "None": 0x2C2F33  # Discord Default Dark Gray
 }
 
-# Load server.json and rolesbadges.json
-with open(data_path("JSON/server.json"), "r", encoding="utf-8") as server_file:
-    server_data = json.load(server_file)
-
-with open(data_path("JSON/rolesbadges.json"), "r", encoding="utf-8") as roles_file:
-    roles_data = json.load(roles_file)
-
 class UserInfoCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = get_verified_store()
+        self.habbo_api = get_habbo_client(bot)
 
     def get_habbo_username(self, discord_id: str):
         """Find Habbo username for a given Discord user ID."""
-        for user in server_data.get("verified_users", []):
-            if user["user_id"] == discord_id:
-                return user["habbo"]
-        return None
+        return self.store.get_habbo(discord_id)
 
     def get_highest_role(self, discord_member: discord.Member, role_category: str):
         """Get the highest role for a given category (EmployeeRoles or DonatorRoles)."""
-        all_roles = roles_data.get("roles", {}).get(role_category, [])
-        user_roles = {r.id: r for r in discord_member.roles}
-
-        for role in all_roles:
-            if role["role_id"] in user_roles:
-                return role["role_name"]
-        return None
+        rule = get_role_resolver().highest_role((r.id for r in discord_member.roles), role_category)
+        return rule.role_name if rule else None
 
     def get_multiple_roles(self, discord_member: discord.Member, role_category: str):
         """Retrieve all roles from a given category (SpecialUnits or Misc)."""
-        all_roles = roles_data.get("roles", {}).get(role_category, [])
-        user_roles = {r.id: r for r in discord_member.roles}
-
-        category_roles = [role["role_name"] for role in all_roles if role["role_id"] in user_roles]
+        rules = get_role_resolver().roles_in((r.id for r in discord_member.roles), role_category)
+        category_roles = [rule.role_name for rule in rules]
         return " ".join(category_roles) if category_roles else "None"
 
     def format_timestamp(self, iso_timestamp: str):
@@ -65,12 +50,7 @@ class UserInfoCog(commands.Cog):
 
     async def fetch_habbo_profile(self, habbo_name: str):
         """Fetch user profile details from the Habbo API."""
-        url = f"https://www.habbo.com/api/public/users?name={habbo_name}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-        return None
+        return await self.habbo_api.get_user(habbo_name)
 
     @app_commands.command(name="info", description="Fetch Habbo details of a verified user.")
     async def info(self, interaction: discord.Interaction, member: discord.Member):
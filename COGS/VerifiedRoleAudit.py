@@ -1,10 +1,10 @@
 import asyncio
-import json
 
 import discord
 from discord.ext import commands
 
-from COGS.paths import data_path
+from COGS.member_events import MemberChange, get_member_dispatcher
+from COGS.role_resolver import get_role_resolver
 
 VERIFIED_ROLE_NAME = "Verified"
 EMPLOYEE_ROLE_ID = 1248313244481884220
@@ -31,17 +31,6 @@ def _has_any_role_id(member: discord.Member, role_ids: set[int]) -> bool:
     return any(role.id in role_ids for role in member.roles)
 
 
-def _load_roles_data() -> dict:
-    roles_path = data_path("JSON/rolesbadges.json")
-    try:
-        with open(roles_path, "r", encoding="utf-8") as file:
-            data = json.load(file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
-
-    return data.get("roles", {}) if isinstance(data, dict) else {}
-
-
 def _load_exempt_role_ids(roles_data: dict) -> set[int]:
     exempt_role_ids: set[int] = set()
 
@@ -146,9 +135,38 @@ class VerifiedRoleAudit(commands.Cog):
         self._ready_once = False
         self._alerted_users: set[int] = set()
         self._lock = asyncio.Lock()
-        roles_data = _load_roles_data()
-        self._exempt_role_ids = _load_exempt_role_ids(roles_data)
-        self._employee_role_ids = _load_employee_role_ids(roles_data)
+        self._roles_source = None
+        self._cached_exempt_role_ids: set[int] = set()
+        self._cached_employee_role_ids: set[int] = {EMPLOYEE_ROLE_ID}
+        self.member_subscription = get_member_dispatcher(bot).subscribe(
+            "VerifiedRoleAudit", self.on_compliance_change,
+            role_ids=self._relevant_role_ids, role_names={VERIFIED_ROLE_NAME},
+        )
+
+    async def cog_unload(self):
+        get_member_dispatcher(self.bot).unsubscribe(self.member_subscription)
+
+    def _relevant_role_ids(self) -> set[int]:
+        """Roles whose addition/removal can change _needs_action."""
+        return self._employee_role_ids | self._exempt_role_ids | {SPECIAL_VISITOR_ROLE_ID}
+
+    def _refresh_role_ids(self) -> None:
+        # rolesbadges.json is hot-reloaded; rebuild the ID sets when the resolver is swapped.
+        resolver = get_role_resolver()
+        if resolver is not self._roles_source:
+            self._cached_exempt_role_ids = _load_exempt_role_ids(resolver.roles_data)
+            self._cached_employee_role_ids = _load_employee_role_ids(resolver.roles_data)
+            self._roles_source = resolver
+
+    @property
+    def _exempt_role_ids(self) -> set[int]:
+        self._refresh_role_ids()
+        return self._cached_exempt_role_ids
+
+    @property
+    def _employee_role_ids(self) -> set[int]:
+        self._refresh_role_ids()
+        return self._cached_employee_role_ids
 
     def _get_alert_channel(self, guild: discord.Guild) -> discord.TextChannel | None:
         return discord.utils.get(guild.text_channels, name=ALERT_CHANNEL_NAME)
@@ -220,8 +238,8 @@ class VerifiedRoleAudit(commands.Cog):
             await self._scan_guild(guild)
             await asyncio.sleep(RATE_LIMIT_DELAY)
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
+    async def on_compliance_change(self, change: MemberChange):
+        before, after = change.before, change.after
         if _needs_action(after, self._exempt_role_ids, self._employee_role_ids) and not _needs_action(
             before, self._exempt_role_ids, self._employee_role_ids
         ):
@@ -1,12 +1,11 @@
 # verify_watch.py
-import json
 import asyncio
 import discord
 from discord.ext import commands
 
-from COGS.paths import data_path
+from COGS.member_events import MemberChange, get_member_dispatcher
+from COGS.verified_store import get_verified_store
 
-SERVER_JSON_PATH = data_path("JSON/server.json")
 VERIFIED_ROLE_NAME = "Verified"
 ALERT_CHANNEL_ID = 1404605698960003123
 KICK_REASON = "Kicked from Server - Not Verified with Bot After Warning"
@@ -15,17 +14,8 @@ KICK_REASON = "Kicked from Server - Not Verified with Bot After Warning"
 RATE_LIMIT_DELAY = 2.5
 
 
-def _load_verified_ids() -> set[str]:
-    try:
-        with open(SERVER_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except Exception:
-        return set()
-    return {
-        str(entry.get("user_id"))
-        for entry in data.get("verified_users", [])
-        if isinstance(entry, dict) and "user_id" in entry
-    }
+def _is_verified_id(user_id: int) -> bool:
+    return user_id in get_verified_store()
 
 
 def _has_verified_role(member: discord.Member) -> bool:
@@ -76,6 +66,12 @@ class VerifyWatch(commands.Cog):
         self._ready_once = False
         self._alerted_users: set[int] = set()
         self._lock = asyncio.Lock()
+        self.member_subscription = get_member_dispatcher(bot).subscribe(
+            "VerifyWatch", self.on_verified_change, role_names={VERIFIED_ROLE_NAME}
+        )
+
+    async def cog_unload(self):
+        get_member_dispatcher(self.bot).unsubscribe(self.member_subscription)
 
     async def _already_alerted(self, channel: discord.abc.Messageable, user_id: int) -> bool:
         # In-memory check first
@@ -117,9 +113,8 @@ class VerifyWatch(commands.Cog):
             self._alerted_users.add(member.id)
 
     async def _scan_guild(self, guild: discord.Guild):
-        verified_ids = _load_verified_ids()
         for member in guild.members:
-            if _has_verified_role(member) and str(member.id) not in verified_ids:
+            if _has_verified_role(member) and not _is_verified_id(member.id):
                 await self._post_alert(member)
                 await asyncio.sleep(RATE_LIMIT_DELAY)  # delay between posts
 
@@ -132,14 +127,11 @@ class VerifyWatch(commands.Cog):
             await self._scan_guild(guild)
             await asyncio.sleep(RATE_LIMIT_DELAY)  # small delay between guild scans
 
-    @commands.Cog.listener()
-    async def on_member_update(self, before: discord.Member, after: discord.Member):
-        before_has = _has_verified_role(before)
-        after_has = _has_verified_role(after)
-        if before_has or not after_has:
+    async def on_verified_change(self, change: MemberChange):
+        after = change.after
+        if not _has_verified_role(after) or _has_verified_role(change.before):
             return
-        verified_ids = _load_verified_ids()
-        if str(after.id) not in verified_ids:
+        if not _is_verified_id(after.id):
             await asyncio.sleep(RATE_LIMIT_DELAY)  # smooth bursts
             await self._post_alert(after)
 
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import OrderedDict
+
+import aiohttp
+
+DEFAULT_HOTEL = "com"
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+CONNECTION_LIMIT = 20            # total pooled connections
+CONNECTION_LIMIT_PER_HOST = 10   # per habbo.<hotel> host
+DNS_CACHE_TTL = 300              # seconds
+KEEPALIVE_TIMEOUT = 30           # seconds an idle connection stays open
+
+MAX_RETRIES = 3                  # extra attempts after a 429/5xx/transport error
+BACKOFF_BASE = 1.0               # seconds, doubled on each retry
+BACKOFF_MAX = 30.0
+
+CACHE_MAX_ENTRIES = 4096
+PROFILE_TTL = 120                # seconds a /users profile is reused
+GROUPS_TTL = 300                 # seconds a /users/{id}/groups list is reused
+NOT_FOUND_TTL = 60               # seconds a 404 is remembered
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries each carry their own expiry."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=_MISSING):
+        item = self._entries.get(key)
+        if item is None or item[0] <= time.monotonic():
+            if item is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def set(self, key, value, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+class HabboApiClient:
+    """Bot-wide client for the public Habbo API.
+
+    Owns one connection-pooled aiohttp session (keep-alive, DNS cache,
+    timeouts). The session is created lazily on the first request so the
+    client can be built outside the event loop.
+
+    Responses are kept in a TTLCache keyed by (hotel, name) and uniqueId, with
+    separate lifetimes for profiles, groups and 404s. Pass ``fresh=True`` to
+    skip the cached copy when stale data is not acceptable (e.g. motto checks).
+    Concurrent callers asking for the same key share one in-flight request.
+    """
+
+    def __init__(self):
+        self._session: aiohttp.ClientSession | None = None
+        self.cache = TTLCache()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        self._backoff_until = 0.0
+        # case-folded group name -> group ID, learned from every group list fetched
+        self.seen_groups: dict[str, str] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    def base_url(hotel: str = DEFAULT_HOTEL) -> str:
+        return f"https://www.habbo.{hotel or DEFAULT_HOTEL}/api/public"
+
+    async def _get_json(self, url: str, params: dict | None = None):
+        """GET ``url`` and return ``(status, json)``; status is None on transport errors.
+
+        429 and 5xx responses (and transport errors) are retried with
+        exponential backoff. A 429 pauses every request on this client until
+        the Retry-After window has passed, so parallel sweeps slow down together.
+        """
+        status = None
+        for attempt in range(MAX_RETRIES + 1):
+            wait = self._backoff_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.8, 1.2)
+            try:
+                async with self.session.get(url, params=params) as response:
+                    status = response.status
+                    if status == 200:
+                        return status, await response.json()
+                    if status == 429:
+                        retry_after = response.headers.get("Retry-After")
+                        if retry_after and retry_after.isdigit():
+                            delay = min(BACKOFF_MAX, float(retry_after))
+                        self._backoff_until = max(self._backoff_until, time.monotonic() + delay)
+                    elif status < 500:
+                        if status != 404:
+                            print(f"[HabboAPI] {url} returned status {status}")
+                        return status, None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = None
+                if attempt == MAX_RETRIES:
+                    print(f"[HabboAPI] Request to {url} failed: {e!r}")
+                    return None, None
+
+            if attempt < MAX_RETRIES:
+                await asyncio.sleep(delay)
+
+        print(f"[HabboAPI] {url} still returning status {status} after {MAX_RETRIES} retries")
+        return status, None
+
+    async def _cached_get(self, key: tuple, ttl: float, url: str, params: dict | None = None,
+                          fresh: bool = False):
+        if not fresh:
+            cached = self.cache.get(key)
+            if cached is not _MISSING:
+                return cached
+
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._fetch(key, ttl, url, params))
+            self._inflight[key] = flight
+            flight.add_done_callback(lambda done: self._end_flight(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller being cancelled does not cancel the others.
+        return await asyncio.shield(flight)
+
+    def _end_flight(self, key: tuple, flight: asyncio.Future) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    async def _fetch(self, key: tuple, ttl: float, url: str, params: dict | None):
+        status, data = await self._get_json(url, params)
+        if status == 200:
+            self.cache.set(key, data, ttl)
+        elif status == 404:
+            self.cache.set(key, None, NOT_FOUND_TTL)
+        return data
+
+    async def get_user(self, name: str, hotel: str = DEFAULT_HOTEL, fresh: bool = False) -> dict | None:
+        """Profile for a Habbo name (``/users?name=``)."""
+        hotel = hotel or DEFAULT_HOTEL
+        data = await self._cached_get(
+            ("user", hotel, name.lower()), PROFILE_TTL,
+            f"{self.base_url(hotel)}/users", params={"name": name}, fresh=fresh,
+        )
+        if data and data.get("uniqueId"):
+            self.cache.set(("user_id", hotel, data["uniqueId"]), data, PROFILE_TTL)
+        return data
+
+    async def get_user_by_id(self, unique_id: str, hotel: str = DEFAULT_HOTEL, fresh: bool = False) -> dict | None:
+        """Profile for a Habbo uniqueId (``/users/{id}``)."""
+        hotel = hotel or DEFAULT_HOTEL
+        return await self._cached_get(
+            ("user_id", hotel, unique_id), PROFILE_TTL,
+            f"{self.base_url(hotel)}/users/{unique_id}", fresh=fresh,
+        )
+
+    async def get_groups(self, unique_id: str, hotel: str = DEFAULT_HOTEL, fresh: bool = False) -> list | None:
+        """Groups a Habbo uniqueId belongs to (``/users/{id}/groups``)."""
+        hotel = hotel or DEFAULT_HOTEL
+        groups = await self._cached_get(
+            ("groups", hotel, unique_id), GROUPS_TTL,
+            f"{self.base_url(hotel)}/users/{unique_id}/groups", fresh=fresh,
+        )
+        for group in groups or ():
+            if isinstance(group, dict) and group.get("id") and group.get("name"):
+                self.seen_groups[group["name"].casefold()] = group["id"]
+        return groups
+
+    def find_group_id(self, name: str) -> str | None:
+        """Group ID for a group name seen in any fetched group list, if any."""
+        return self.seen_groups.get(name.casefold())
+
+    def cache_stats(self) -> dict:
+        return {**self.cache.stats(), "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+def get_habbo_client(bot) -> HabboApiClient:
+    """Return the client owned by ``bot``, creating it on first use."""
+    client = getattr(bot, "habbo_api", None)
+    if client is None:
+        client = HabboApiClient()
+        bot.habbo_api = client
+    return client
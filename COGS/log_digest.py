@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import time
+
+import discord
+
+DIGEST_INTERVAL = 30         # seconds between flushes
+DIGEST_FLUSH_SIZE = 10       # flush early once this many entries are waiting
+EMBEDS_PER_MESSAGE = 10      # Discord's limit
+ATTACHMENT_THRESHOLD = 30    # larger batches go out as one text attachment
+
+
+def _embed_text(embed: discord.Embed) -> str:
+    parts = [f"{field.name}: {field.value}".replace("\n", ", ") for field in embed.fields]
+    return " | ".join(parts) or (embed.title or "")
+
+
+class LogDigest:
+    """Buffer for log embeds that are delivered in batches by a background task.
+
+    ``push`` never waits on Discord. The buffer is flushed every
+    DIGEST_INTERVAL seconds, or sooner once DIGEST_FLUSH_SIZE entries are
+    waiting. Small batches go out as messages of up to 10 embeds. Larger ones
+    are sent as a single text attachment.
+    """
+
+    def __init__(self, bot, channel_id: int, title: str, interval: float = DIGEST_INTERVAL):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.title = title
+        self.interval = interval
+        self._pending: list[tuple[discord.Embed, str]] = []
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def push(self, embed: discord.Embed, text: str | None = None) -> None:
+        """Queue ``embed``; ``text`` is its one-line form for attachments."""
+        self._pending.append((embed, text or _embed_text(embed)))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._pending) >= DIGEST_FLUSH_SIZE:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Let entries pushed in the same burst join this batch.
+            await asyncio.sleep(0)
+            await self.flush()
+
+    async def flush(self) -> None:
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            print(f"[LogDigest] Channel {self.channel_id} not found; dropped {len(batch)} '{self.title}' entries.")
+            return
+        try:
+            if len(batch) > ATTACHMENT_THRESHOLD:
+                lines = "\n".join(text for _, text in batch)
+                file = discord.File(
+                    io.BytesIO(lines.encode("utf-8")),
+                    filename=f"{self.title.lower().replace(' ', '_')}_{int(time.time())}.txt",
+                )
+                await channel.send(content=f"**{self.title}**: {len(batch)} entries", file=file)
+            else:
+                embeds = [embed for embed, _ in batch]
+                for start in range(0, len(embeds), EMBEDS_PER_MESSAGE):
+                    await channel.send(embeds=embeds[start:start + EMBEDS_PER_MESSAGE])
+        except discord.HTTPException as e:
+            print(f"[LogDigest] Failed to deliver {len(batch)} '{self.title}' entries: {e}")
+
+    async def close(self) -> None:
+        """Stop the background task and deliver whatever is still buffered."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Iterable
+
+import discord
+
+
+@dataclass(frozen=True)
+class MemberChange:
+    """What an ``on_member_update`` changed, computed once for every subscriber."""
+    before: discord.Member
+    after: discord.Member
+    added_roles: tuple[discord.Role, ...]
+    removed_roles: tuple[discord.Role, ...]
+    added_role_ids: frozenset[int]
+    removed_role_ids: frozenset[int]
+    nick_changed: bool
+
+    @property
+    def roles_changed(self) -> bool:
+        return bool(self.added_role_ids or self.removed_role_ids)
+
+    @property
+    def changed_roles(self) -> tuple[discord.Role, ...]:
+        return self.added_roles + self.removed_roles
+
+    @classmethod
+    def from_update(cls, before: discord.Member, after: discord.Member) -> "MemberChange":
+        before_ids = {role.id for role in before.roles}
+        after_ids = {role.id for role in after.roles}
+        return cls(
+            before=before,
+            after=after,
+            added_roles=tuple(role for role in after.roles if role.id not in before_ids),
+            removed_roles=tuple(role for role in before.roles if role.id not in after_ids),
+            added_role_ids=frozenset(after_ids - before_ids),
+            removed_role_ids=frozenset(before_ids - after_ids),
+            nick_changed=before.nick != after.nick,
+        )
+
+
+Handler = Callable[[MemberChange], Awaitable[None]]
+
+
+@dataclass(eq=False)
+class Subscription:
+    """A handler plus what it cares about.
+
+    ``role_ids`` may be a set or a zero-argument callable returning one, for
+    subscribers whose roles come from a hot-reloaded mapping. ``role_names``
+    are matched case-insensitively against the changed roles only.
+    """
+    name: str
+    handler: Handler
+    role_ids: Iterable[int] | Callable[[], Iterable[int]] = ()
+    role_names: frozenset[str] = field(default_factory=frozenset)
+    any_role: bool = False
+    nick: bool = False
+
+    def wants(self, change: MemberChange) -> bool:
+        if self.nick and change.nick_changed:
+            return True
+        if not change.roles_changed:
+            return False
+        if self.any_role:
+            return True
+        role_ids = self.role_ids() if callable(self.role_ids) else self.role_ids
+        if not change.added_role_ids.isdisjoint(role_ids) or not change.removed_role_ids.isdisjoint(role_ids):
+            return True
+        return bool(self.role_names) and any(role.name.lower() in self.role_names for role in change.changed_roles)
+
+
+class MemberUpdateDispatcher:
+    """Single ``on_member_update`` listener that fans out to interested cogs.
+
+    The role diff and nickname change are computed once per event; only the
+    subscriptions whose declared interest matches are awaited, concurrently.
+    """
+
+    def __init__(self):
+        self._subscriptions: list[Subscription] = []
+
+    def subscribe(self, name: str, handler: Handler, *, role_ids=(), role_names: Iterable[str] = (),
+                  any_role: bool = False, nick: bool = False) -> Subscription:
+        subscription = Subscription(
+            name=name,
+            handler=handler,
+            role_ids=role_ids if callable(role_ids) else frozenset(role_ids),
+            role_names=frozenset(role_name.lower() for role_name in role_names),
+            any_role=any_role,
+            nick=nick,
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member) -> None:
+        change = MemberChange.from_update(before, after)
+        if not change.roles_changed and not change.nick_changed:
+            return
+        targets = [subscription for subscription in self._subscriptions if subscription.wants(change)]
+        if not targets:
+            return
+        results = await asyncio.gather(*(subscription.handler(change) for subscription in targets),
+                                       return_exceptions=True)
+        for subscription, result in zip(targets, results):
+            if isinstance(result, Exception):
+                print(f"[MemberEvents] {subscription.name} failed for {after} ({after.id}): {result!r}")
+
+
+def get_member_dispatcher(bot) -> MemberUpdateDispatcher:
+    """Return the dispatcher owned by ``bot``, registering its listener on first use."""
+    dispatcher = getattr(bot, "member_events", None)
+    if dispatcher is None:
+        dispatcher = MemberUpdateDispatcher()
+        bot.member_events = dispatcher
+        bot.add_listener(dispatcher.on_member_update, "on_member_update")
+    return dispatcher
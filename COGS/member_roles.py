@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+import discord
+
+
+def _can_manage(guild: discord.Guild, role: discord.Role) -> bool:
+    me = guild.me
+    return me is not None and not role.managed and not role.is_default() and role < me.top_role
+
+
+async def apply_role_diff(
+    member: discord.Member,
+    add_ids: Iterable[int],
+    remove_ids: Iterable[int],
+    reason: str | None = None,
+    nick: str | None = None,
+) -> tuple[list[str], list[str]]:
+    """Apply a role diff to ``member`` and return the (added, removed) role names.
+
+    The final role set (and ``nick``, if given) is sent as a single
+    ``member.edit`` request. If Discord rejects it (usually role hierarchy),
+    each manageable role is added/removed on its own, the nickname is set
+    separately, and anything the bot cannot touch is skipped.
+    """
+    guild = member.guild
+    current = set(member.roles)
+    to_add = [role for role in (guild.get_role(rid) for rid in set(add_ids)) if role and role not in current]
+    to_remove = [role for role in (guild.get_role(rid) for rid in set(remove_ids)) if role and role in current]
+    if nick == member.nick:
+        nick = None
+    if not to_add and not to_remove and nick is None:
+        return [], []
+
+    edit = {"reason": reason}
+    if to_add or to_remove:
+        remove_set = set(to_remove)
+        edit["roles"] = [role for role in member.roles if not role.is_default() and role not in remove_set] + to_add
+    if nick is not None:
+        edit["nick"] = nick
+    try:
+        await member.edit(**edit)
+        return [role.name for role in to_add], [role.name for role in to_remove]
+    except discord.Forbidden:
+        pass
+
+    if nick is not None:
+        try:
+            await member.edit(nick=nick, reason=reason)
+        except discord.Forbidden:
+            pass
+    added, removed = [], []
+    for role in to_add:
+        if not _can_manage(guild, role):
+            continue
+        try:
+            await member.add_roles(role, reason=reason)
+            added.append(role.name)
+        except discord.Forbidden:
+            pass
+    for role in to_remove:
+        if not _can_manage(guild, role):
+            continue
+        try:
+            await member.remove_roles(role, reason=reason)
+            removed.append(role.name)
+        except discord.Forbidden:
+            pass
+    return added, removed
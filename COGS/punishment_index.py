@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from COGS.storage import PUNISHMENT_LISTS
+
+
+class PunishmentIndex:
+    """Lookup tables over punishment.json, kept in step with every add/remove.
+
+    - ``by_name``: case-folded Habbo name -> {list_type: stored key}
+    - ``by_unique_id``: Habbo uniqueId -> {list_type: stored key}, for entries that carry one
+    - ``banned_group_ids``: frozenset of Habbo group IDs from ``banned_groups``
+
+    The stored key is the name exactly as it appears in punishment.json, so
+    removals and saves keep addressing the original record.
+    """
+
+    def __init__(self, punishment_data: dict):
+        self.by_name: dict[str, dict[str, str]] = {}
+        self.by_unique_id: dict[str, dict[str, str]] = {}
+        self.banned_group_ids: frozenset[str] = frozenset()
+        self.rebuild(punishment_data)
+
+    def rebuild(self, punishment_data: dict) -> None:
+        self.by_name.clear()
+        self.by_unique_id.clear()
+        for list_type, users in punishment_data.get("banned_users", {}).items():
+            for habbo, entry in users.items():
+                self.add(list_type, habbo, entry)
+        self.set_groups(punishment_data.get("banned_groups", []))
+
+    def add(self, list_type: str, habbo: str, entry: dict) -> None:
+        self.by_name.setdefault(habbo.casefold(), {})[list_type] = habbo
+        unique_id = entry.get("unique_id") if isinstance(entry, dict) else None
+        if unique_id:
+            self.by_unique_id.setdefault(unique_id, {})[list_type] = habbo
+
+    def remove(self, list_type: str, habbo: str, entry: dict | None = None) -> None:
+        self._discard(self.by_name, habbo.casefold(), list_type)
+        unique_id = entry.get("unique_id") if isinstance(entry, dict) else None
+        if unique_id:
+            self._discard(self.by_unique_id, unique_id, list_type)
+
+    @staticmethod
+    def _discard(table: dict, key: str, list_type: str) -> None:
+        lists = table.get(key)
+        if lists is not None:
+            lists.pop(list_type, None)
+            if not lists:
+                del table[key]
+
+    def set_groups(self, banned_groups: list) -> None:
+        self.banned_group_ids = frozenset(
+            group["badge_id"] for group in banned_groups if isinstance(group, dict) and group.get("badge_id")
+        )
+
+    def find(self, list_type: str, habbo: str) -> str | None:
+        """Stored key for ``habbo`` on ``list_type``, matched case-insensitively."""
+        return self.by_name.get(habbo.casefold(), {}).get(list_type)
+
+    def lists_for(self, habbo: str | None = None, unique_id: str | None = None) -> list[str]:
+        """Punishment lists a Habbo is on, by name (any case) or uniqueId."""
+        found = set()
+        if habbo:
+            found.update(self.by_name.get(habbo.casefold(), {}))
+        if unique_id:
+            found.update(self.by_unique_id.get(unique_id, {}))
+        return [list_type for list_type in PUNISHMENT_LISTS if list_type in found]
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Iterable
+
+from COGS.paths import data_path
+
+ROLES_FILE = data_path("JSON/rolesbadges.json")
+ROLES_POLL_INTERVAL = 15  # seconds between rolesbadges.json mtime checks
+
+CATEGORIES = ("EmployeeRoles", "DonatorRoles", "Misc", "SpecialUnits")
+EMPLOYEE_CATEGORY = "EmployeeRoles"
+
+CDA_EMPLOYEE_ROLE_ID = 1248313244481884220
+IC_ROLE_ID = 1249819550015426571
+
+
+def validate_roles_data(roles_data) -> None:
+    """Raise ValueError unless ``roles_data`` has every category as a list."""
+    if not isinstance(roles_data, dict):
+        raise ValueError("roles_data must be a dictionary.")
+    for key in CATEGORIES:
+        if key not in roles_data:
+            raise ValueError(f"Missing expected key: '{key}' in roles_data.")
+        if not isinstance(roles_data[key], list):
+            raise ValueError(f"'{key}' must be a list of roles.")
+
+
+@dataclass(frozen=True)
+class RoleRule:
+    category: str
+    rank: int           # position within its category; 0 is the highest
+    role_id: int
+    role_name: str
+    group_id: str | None
+    cdaemployee: bool
+    ic: bool
+
+
+class RoleResolver:
+    """rolesbadges.json compiled into lookup tables.
+
+    - ``by_group``: Habbo group ID -> rules it grants
+    - ``managed_role_ids``: every role the bot reconciles (incl. umbrella roles)
+    - ``categories``: rules per category in file order (EmployeeRoles rank order)
+
+    Instances are immutable once built; reloading builds a new one and swaps it.
+    """
+
+    def __init__(self, roles_data: dict, mtime_ns: int | None = None):
+        validate_roles_data(roles_data)
+        self.roles_data = roles_data
+        self.mtime_ns = mtime_ns
+        by_group: dict[str, list[RoleRule]] = {}
+        categories: dict[str, tuple[RoleRule, ...]] = {}
+        by_role_id: dict[int, RoleRule] = {}
+
+        for category in CATEGORIES:
+            rules = []
+            for rank, role_data in enumerate(roles_data.get(category, [])):
+                role_id = role_data.get("role_id")
+                if not role_id:
+                    continue
+                rule = RoleRule(
+                    category=category,
+                    rank=rank,
+                    role_id=role_id,
+                    role_name=role_data.get("role_name", ""),
+                    group_id=role_data.get("group_id"),
+                    cdaemployee=role_data.get("cdaemployee") == "yes",
+                    ic=role_data.get("iC") == "yes",
+                )
+                rules.append(rule)
+                by_role_id.setdefault(role_id, rule)
+                if rule.group_id:
+                    by_group.setdefault(rule.group_id, []).append(rule)
+            categories[category] = tuple(rules)
+
+        self.by_group = {group_id: tuple(rules) for group_id, rules in by_group.items()}
+        self.categories = categories
+        self.by_role_id = by_role_id
+        self.managed_role_ids = frozenset(by_role_id) | {CDA_EMPLOYEE_ROLE_ID, IC_ROLE_ID}
+        self.group_ids = frozenset(self.by_group)
+
+    @classmethod
+    def from_file(cls, path=ROLES_FILE, validator=validate_roles_data) -> "RoleResolver":
+        mtime_ns = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as file:
+            data = json.load(file)
+        roles_data = data.get("roles", {}) if isinstance(data, dict) else None
+        validator(roles_data)
+        return cls(roles_data, mtime_ns)
+
+    @staticmethod
+    def _group_ids(groups: Iterable) -> Iterable[str]:
+        for group in groups:
+            if isinstance(group, dict):
+                group_id = group.get("id")
+                if group_id:
+                    yield group_id
+            elif group:
+                yield group
+
+    def expected_roles(self, groups: Iterable) -> set[int]:
+        """Role IDs a member in ``groups`` (dicts or IDs) should hold, in one pass.
+
+        EmployeeRoles: only the highest-ranked match. Other categories are
+        additive. CDA Employee / iC umbrella roles come from ANY matched
+        employee role.
+        """
+        expected = set()
+        best_employee = None
+        cdaemployee = ic = False
+        for group_id in self._group_ids(groups):
+            for rule in self.by_group.get(group_id, ()):
+                if rule.category == EMPLOYEE_CATEGORY:
+                    if best_employee is None or rule.rank < best_employee.rank:
+                        best_employee = rule
+                    cdaemployee = cdaemployee or rule.cdaemployee
+                    ic = ic or rule.ic
+                else:
+                    expected.add(rule.role_id)
+        if best_employee is not None:
+            expected.add(best_employee.role_id)
+        if cdaemployee:
+            expected.add(CDA_EMPLOYEE_ROLE_ID)
+        if ic:
+            expected.add(IC_ROLE_ID)
+        return expected
+
+    def diff(self, current_role_ids: Iterable[int], groups: Iterable, motto: str = "") -> tuple[set[int], set[int]]:
+        """Return (roles_to_add, roles_to_remove) for a member.
+
+        Only managed roles are ever removed. CDA Employee is kept while the
+        Habbo motto mentions "CDA".
+        """
+        current = set(current_role_ids)
+        expected = self.expected_roles(groups)
+        to_add = expected - current
+        to_remove = (current - expected) & self.managed_role_ids
+        if CDA_EMPLOYEE_ROLE_ID in to_remove and "cda" in (motto or "").lower():
+            to_remove.discard(CDA_EMPLOYEE_ROLE_ID)
+        return to_add, to_remove
+
+    def highest_role(self, role_ids: Iterable[int], category: str) -> RoleRule | None:
+        """Highest-ranked rule of ``category`` among ``role_ids``."""
+        held = [self.by_role_id[rid] for rid in role_ids if rid in self.by_role_id]
+        held = [rule for rule in held if rule.category == category]
+        return min(held, key=lambda rule: rule.rank, default=None)
+
+    def roles_in(self, role_ids: Iterable[int], category: str) -> list[RoleRule]:
+        """All rules of ``category`` among ``role_ids``, in file order."""
+        held = set(role_ids)
+        return [rule for rule in self.categories.get(category, ()) if rule.role_id in held]
+
+    def category_role_ids(self, category: str) -> set[int]:
+        return {rule.role_id for rule in self.categories.get(category, ())}
+
+
+_resolver: RoleResolver | None = None
+_rejected_mtime_ns: int | None = None
+
+
+def load_role_resolver(path=ROLES_FILE, validator=validate_roles_data) -> RoleResolver:
+    """Compile ``path`` and atomically swap it in as the shared resolver."""
+    global _resolver
+    _resolver = RoleResolver.from_file(path, validator)
+    return _resolver
+
+
+def get_role_resolver() -> RoleResolver:
+    """Return the shared resolver, compiling rolesbadges.json on first use.
+
+    Callers should fetch it per operation rather than keep a reference, so a
+    reload is picked up everywhere at once.
+    """
+    global _resolver
+    if _resolver is None:
+        try:
+            load_role_resolver()
+        except (OSError, ValueError) as e:
+            print(f"Error loading {ROLES_FILE}: {e}")
+            _resolver = RoleResolver({key: [] for key in CATEGORIES})
+    return _resolver
+
+
+def reload_if_changed(path=ROLES_FILE, validator=validate_roles_data) -> RoleResolver | None:
+    """Recompile ``path`` if its mtime moved; return the new resolver or None.
+
+    A file that fails to parse or validate is reported once and the running
+    resolver stays in place until the file changes again.
+    """
+    global _rejected_mtime_ns
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    current = get_role_resolver()
+    if mtime_ns == current.mtime_ns or mtime_ns == _rejected_mtime_ns:
+        return None
+    try:
+        resolver = load_role_resolver(path, validator)
+    except Exception as e:
+        _rejected_mtime_ns = mtime_ns
+        print(f"[RoleResolver] Rejected edit to {path}, keeping the previous mapping: {e}")
+        return None
+    _rejected_mtime_ns = None
+    print(f"[RoleResolver] Reloaded {path}: {len(resolver.by_group)} groups, "
+          f"{len(resolver.managed_role_ids)} managed roles.")
+    return resolver
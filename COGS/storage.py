@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+from COGS.paths import data_path
+
+# "json" keeps the original JSON/*.json files; "sqlite" uses DATABASE_FILE.
+STORAGE_BACKEND = "json"
+
+SERVER_FILE = data_path("JSON/server.json")
+PUNISHMENT_FILE = data_path("JSON/punishment.json")
+VERIFICATION_FILE = data_path("JSON/verification_codes.json")
+DATABASE_FILE = data_path("JSON/cda.sqlite3")
+
+# Seconds a dirty JSON document may wait so bursts of changes share one write.
+WRITE_BEHIND_DELAY = 2.0
+
+PUNISHMENT_LISTS = ("BoS", "DNH", "NP")
+
+# Read once at import: os.umask() can only be queried by setting it, which is
+# not safe from the writer threads.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def default_server_data() -> dict:
+    return {"verified_users": [], "channels": {"verification": None}}
+
+
+def default_punishment_data() -> dict:
+    return {"banned_users": {name: {} for name in PUNISHMENT_LISTS}, "banned_groups": []}
+
+
+def default_verification_data() -> dict:
+    return {"verification_data": {}}
+
+
+def _read_json(path: Path, default: dict) -> dict:
+    if not path.exists():
+        return default
+    try:
+        with path.open("r", encoding="utf-8") as file:
+            return json.load(file)
+    except json.JSONDecodeError:
+        print(f"Error decoding {path}. Ensure it's valid JSON.")
+        return default
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    """Write via temp file + fsync + rename so a crash never leaves a torn file."""
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = 0o666 & ~_UMASK
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        # mkstemp creates 0600; keep the mode the file had (or would get from open())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+class JsonWriteBehind:
+    """Coalesces JSON document saves and writes them off the event loop.
+
+    ``mark_dirty`` records the latest document for a path and schedules one
+    flush ``delay`` seconds later; more changes inside that window ride along.
+    Documents are serialized on the loop (where they are mutated) and only the
+    disk write + fsync runs in a worker thread.
+    """
+
+    def __init__(self, delay: float = WRITE_BEHIND_DELAY):
+        self.delay = delay
+        self._dirty: dict[Path, dict] = {}
+        self._handle: asyncio.TimerHandle | None = None
+        self._task: asyncio.Task | None = None
+        self._lock: asyncio.Lock | None = None
+
+    def mark_dirty(self, path: Path, doc: dict) -> None:
+        self._dirty[path] = doc
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, migration): write straight away.
+            self.flush_sync()
+            return
+        if self._handle is None:
+            self._handle = loop.call_later(self.delay, self._start_flush)
+
+    def _start_flush(self) -> None:
+        self._handle = None
+        self._task = asyncio.get_running_loop().create_task(self.flush())
+
+    def _take_dirty(self) -> list[tuple[Path, str]]:
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        pending = [(path, json.dumps(doc, indent=4)) for path, doc in self._dirty.items()]
+        self._dirty.clear()
+        return pending
+
+    async def flush(self) -> None:
+        """Write every dirty document now; safe to await from shutdown hooks."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            for path, text in self._take_dirty():
+                try:
+                    await asyncio.to_thread(_atomic_write, path, text)
+                except Exception as e:
+                    print(f"[Storage] Failed to write {path}: {e}")
+
+    def flush_sync(self) -> None:
+        for path, text in self._take_dirty():
+            _atomic_write(path, text)
+
+
+# --------------------------------------------------------------------------- #
+# JSON backend                                                                #
+# --------------------------------------------------------------------------- #
+class JsonBackend:
+    """Original layout: one JSON document per file.
+
+    The record-level methods take the full in-memory document because a JSON
+    file can only be persisted as a whole; writes go through JsonWriteBehind.
+    """
+
+    def __init__(self, server_file=SERVER_FILE, punishment_file=PUNISHMENT_FILE,
+                 verification_file=VERIFICATION_FILE, writer: JsonWriteBehind | None = None):
+        self.server_file = Path(server_file)
+        self.punishment_file = Path(punishment_file)
+        self.verification_file = Path(verification_file)
+        self.writer = writer or JsonWriteBehind()
+
+    # server.json
+    def load_server(self) -> dict:
+        return _read_json(self.server_file, default_server_data())
+
+    def save_server(self, doc: dict) -> None:
+        self.writer.mark_dirty(self.server_file, doc)
+
+    def upsert_verified_user(self, doc: dict, entry: dict) -> None:
+        self.save_server(doc)
+
+    def delete_verified_user(self, doc: dict, user_id: str) -> None:
+        self.save_server(doc)
+
+    # punishment.json
+    def load_punishments(self) -> dict:
+        return _read_json(self.punishment_file, default_punishment_data())
+
+    def save_punishments(self, doc: dict) -> None:
+        self.writer.mark_dirty(self.punishment_file, doc)
+
+    def upsert_punishment(self, doc: dict, list_type: str, habbo: str, entry: dict) -> None:
+        self.save_punishments(doc)
+
+    def delete_punishment(self, doc: dict, list_type: str, habbo: str) -> None:
+        self.save_punishments(doc)
+
+    def upsert_banned_group(self, doc: dict, group: dict) -> None:
+        self.save_punishments(doc)
+
+    def delete_banned_group(self, doc: dict, name: str) -> None:
+        self.save_punishments(doc)
+
+    # verification_codes.json
+    def load_verification_codes(self) -> dict:
+        return _read_json(self.verification_file, default_verification_data())
+
+    def save_verification_codes(self, doc: dict) -> None:
+        self.writer.mark_dirty(self.verification_file, doc)
+
+    def upsert_verification_code(self, doc: dict, user_id: str, entry: dict) -> None:
+        self.save_verification_codes(doc)
+
+    def delete_verification_codes(self, doc: dict, user_ids) -> None:
+        self.save_verification_codes(doc)
+
+    # bot-internal state documents (JSON/<name>.json)
+    def load_state(self, name: str) -> dict:
+        return _read_json(data_path(f"JSON/{name}.json"), {})
+
+    def save_state(self, name: str, doc: dict) -> None:
+        self.writer.mark_dirty(data_path(f"JSON/{name}.json"), doc)
+
+    async def flush(self) -> None:
+        await self.writer.flush()
+
+    def close(self) -> None:
+        self.writer.flush_sync()
+
+
+# --------------------------------------------------------------------------- #
+# SQLite backend                                                              #
+# --------------------------------------------------------------------------- #
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS server_meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verified_users (
+    user_id TEXT PRIMARY KEY,
+    habbo   TEXT NOT NULL,
+    data    TEXT NOT NULL,
+    seq     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_verified_users_habbo
+    ON verified_users (habbo COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS punishments (
+    list_type TEXT NOT NULL,
+    habbo     TEXT NOT NULL,
+    data      TEXT NOT NULL,
+    PRIMARY KEY (list_type, habbo)
+);
+CREATE TABLE IF NOT EXISTS banned_groups (
+    name TEXT PRIMARY KEY COLLATE NOCASE,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS verification_codes (
+    user_id   TEXT PRIMARY KEY,
+    code      TEXT NOT NULL,
+    habbo     TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bot_state (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SqliteBackend:
+    """Single-file SQLite database in WAL mode with row-level upserts/deletes.
+
+    Loads rebuild the same dict documents the JSON files hold, so cogs keep
+    one in-memory shape regardless of the backend.
+    """
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def is_empty(self) -> bool:
+        tables = ("server_meta", "verified_users", "punishments", "banned_groups", "verification_codes")
+        return not any(
+            self.conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() for table in tables
+        )
+
+    # server
+    def load_server(self) -> dict:
+        doc = default_server_data()
+        for key, value in self.conn.execute("SELECT key, value FROM server_meta"):
+            doc[key] = json.loads(value)
+        doc["verified_users"] = [
+            json.loads(data)
+            for (data,) in self.conn.execute("SELECT data FROM verified_users ORDER BY seq")
+        ]
+        return doc
+
+    def save_server(self, doc: dict) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM server_meta")
+            self.conn.executemany(
+                "INSERT INTO server_meta (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in doc.items() if key != "verified_users"],
+            )
+            self.conn.execute("DELETE FROM verified_users")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO verified_users (user_id, habbo, data, seq) VALUES (?, ?, ?, ?)",
+                [
+                    (str(entry["user_id"]), entry.get("habbo", ""), json.dumps(entry), seq)
+                    for seq, entry in enumerate(doc.get("verified_users", []))
+                    if isinstance(entry, dict) and "user_id" in entry
+                ],
+            )
+
+    def upsert_verified_user(self, doc: dict, entry: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO verified_users (user_id, habbo, data, seq) "
+                "VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), -1) + 1 FROM verified_users)) "
+                "ON CONFLICT (user_id) DO UPDATE SET habbo = excluded.habbo, data = excluded.data",
+                (str(entry["user_id"]), entry.get("habbo", ""), json.dumps(entry)),
+            )
+
+    def delete_verified_user(self, doc: dict, user_id: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM verified_users WHERE user_id = ?", (str(user_id),))
+
+    # punishments
+    def load_punishments(self) -> dict:
+        doc = default_punishment_data()
+        for list_type, habbo, data in self.conn.execute(
+            "SELECT list_type, habbo, data FROM punishments ORDER BY rowid"
+        ):
+            doc["banned_users"].setdefault(list_type, {})[habbo] = json.loads(data)
+        doc["banned_groups"] = [
+            json.loads(data) for (data,) in self.conn.execute("SELECT data FROM banned_groups ORDER BY rowid")
+        ]
+        return doc
+
+    def save_punishments(self, doc: dict) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM punishments")
+            self.conn.executemany(
+                "INSERT INTO punishments (list_type, habbo, data) VALUES (?, ?, ?)",
+                [
+                    (list_type, habbo, json.dumps(entry))
+                    for list_type, users in doc.get("banned_users", {}).items()
+                    for habbo, entry in users.items()
+                ],
+            )
+            self.conn.execute("DELETE FROM banned_groups")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO banned_groups (name, data) VALUES (?, ?)",
+                [(group["name"], json.dumps(group)) for group in doc.get("banned_groups", [])],
+            )
+
+    def upsert_punishment(self, doc: dict, list_type: str, habbo: str, entry: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO punishments (list_type, habbo, data) VALUES (?, ?, ?) "
+                "ON CONFLICT (list_type, habbo) DO UPDATE SET data = excluded.data",
+                (list_type, habbo, json.dumps(entry)),
+            )
+
+    def delete_punishment(self, doc: dict, list_type: str, habbo: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM punishments WHERE list_type = ? AND habbo = ?", (list_type, habbo)
+            )
+
+    def upsert_banned_group(self, doc: dict, group: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO banned_groups (name, data) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET data = excluded.data",
+                (group["name"], json.dumps(group)),
+            )
+
+    def delete_banned_group(self, doc: dict, name: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM banned_groups WHERE name = ?", (name,))
+
+    # verification codes
+    def load_verification_codes(self) -> dict:
+        doc = default_verification_data()
+        for user_id, data in self.conn.execute("SELECT user_id, data FROM verification_codes"):
+            doc["verification_data"][user_id] = json.loads(data)
+        return doc
+
+    def save_verification_codes(self, doc: dict) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM verification_codes")
+            self.conn.executemany(
+                "INSERT INTO verification_codes (user_id, code, habbo, timestamp, data) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (user_id, entry["code"], entry["habbo"], entry["timestamp"], json.dumps(entry))
+                    for user_id, entry in doc.get("verification_data", {}).items()
+                ],
+            )
+
+    def upsert_verification_code(self, doc: dict, user_id: str, entry: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO verification_codes (user_id, code, habbo, timestamp, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id) DO UPDATE SET code = excluded.code, habbo = excluded.habbo, "
+                "timestamp = excluded.timestamp, data = excluded.data",
+                (user_id, entry["code"], entry["habbo"], entry["timestamp"], json.dumps(entry)),
+            )
+
+    def delete_verification_codes(self, doc: dict, user_ids) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM verification_codes WHERE user_id = ?", [(str(uid),) for uid in user_ids]
+            )
+
+    # bot-internal state documents
+    def load_state(self, name: str) -> dict:
+        row = self.conn.execute("SELECT value FROM bot_state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def save_state(self, name: str, doc: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO bot_state (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (name, json.dumps(doc)),
+            )
+
+    async def flush(self) -> None:
+        # Every upsert/delete is committed immediately.
+        pass
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+# --------------------------------------------------------------------------- #
+# backend selection / migration                                               #
+# --------------------------------------------------------------------------- #
+def migrate_json_to_sqlite(backend: SqliteBackend, source: JsonBackend | None = None) -> dict:
+    """Copy server, punishment and verification-code JSON files into SQLite."""
+    source = source or JsonBackend()
+    server = source.load_server()
+    punishments = source.load_punishments()
+    codes = source.load_verification_codes()
+    backend.save_server(server)
+    backend.save_punishments(punishments)
+    backend.save_verification_codes(codes)
+    return {
+        "verified_users": len(server.get("verified_users", [])),
+        "punishments": sum(len(users) for users in punishments.get("banned_users", {}).values()),
+        "banned_groups": len(punishments.get("banned_groups", [])),
+        "verification_codes": len(codes.get("verification_data", {})),
+    }
+
+
+_backend = None
+
+
+def get_backend():
+    """Return the configured backend, migrating JSON into a fresh SQLite DB once."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND == "sqlite":
+            _backend = SqliteBackend()
+            if _backend.is_empty():
+                counts = migrate_json_to_sqlite(_backend)
+                print(f"[Storage] Migrated JSON data into {DATABASE_FILE}: {counts}")
+        else:
+            _backend = JsonBackend()
+    return _backend
+
+
+if __name__ == "__main__":
+    # python -m COGS.storage [database path]
+    target = SqliteBackend(sys.argv[1] if len(sys.argv) > 1 else DATABASE_FILE)
+    print(migrate_json_to_sqlite(target))
+    target.close()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from COGS.habbo_api import DEFAULT_HOTEL
+from COGS.storage import default_server_data, get_backend
+
+
+class VerifiedUserStore:
+    """In-process view of server.json shared by every cog.
+
+    Keeps the whole document (channels, balances, ...) so saves never drop
+    keys another cog owns, plus dict indexes over ``verified_users`` keyed by
+    Discord user ID and lower-cased Habbo name. Persistence goes through the configured storage backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.data: dict = default_server_data()
+        self._by_user_id: dict[str, dict] = {}
+        self._by_habbo: dict[str, dict] = {}
+        self.load()
+
+    # ------------------------------------------------------------------ #
+    # persistence                                                        #
+    # ------------------------------------------------------------------ #
+    def load(self) -> None:
+        data = self.backend.load_server()
+        data.setdefault("verified_users", [])
+        data.setdefault("channels", {"verification": None})
+        self.data = data
+        self._reindex()
+
+    def _reindex(self) -> None:
+        self._by_user_id = {}
+        self._by_habbo = {}
+        for entry in self.data["verified_users"]:
+            if isinstance(entry, dict) and "user_id" in entry:
+                self._index(entry)
+
+    def _index(self, entry: dict) -> None:
+        self._by_user_id[str(entry["user_id"])] = entry
+        habbo = entry.get("habbo")
+        if habbo:
+            self._by_habbo[habbo.lower()] = entry
+
+    def _unindex(self, entry: dict) -> None:
+        self._by_user_id.pop(str(entry["user_id"]), None)
+        habbo = entry.get("habbo")
+        if habbo and self._by_habbo.get(habbo.lower()) is entry:
+            del self._by_habbo[habbo.lower()]
+
+    # ------------------------------------------------------------------ #
+    # lookups                                                            #
+    # ------------------------------------------------------------------ #
+    @property
+    def channels(self) -> dict:
+        return self.data["channels"]
+
+    @property
+    def verified_users(self) -> list[dict]:
+        return self.data["verified_users"]
+
+    def entries(self) -> list[dict]:
+        """One entry per Discord user; duplicate rows in server.json are collapsed."""
+        return list(self._by_user_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_user_id)
+
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self._by_user_id
+
+    def get(self, user_id) -> dict | None:
+        """Return the verified entry for a Discord user ID, if any."""
+        return self._by_user_id.get(str(user_id))
+
+    def get_by_habbo(self, habbo_name: str) -> dict | None:
+        """Return the verified entry for a Habbo name (case-insensitive)."""
+        if not habbo_name:
+            return None
+        return self._by_habbo.get(habbo_name.lower())
+
+    def get_habbo(self, user_id) -> str | None:
+        entry = self.get(user_id)
+        return entry.get("habbo") if entry else None
+
+    def user_ids(self) -> set[str]:
+        return set(self._by_user_id)
+
+    def missing_unique_ids(self) -> list[dict]:
+        """Entries verified before uniqueIds were recorded."""
+        return [entry for entry in self._by_user_id.values() if not entry.get("unique_id")]
+
+    async def ensure_unique_id(self, entry: dict, habbo_api) -> str | None:
+        """Return the entry's Habbo uniqueId, resolving it by name and saving it if missing."""
+        unique_id = entry.get("unique_id")
+        if unique_id:
+            return unique_id
+        hotel = entry.get("hotel", DEFAULT_HOTEL)
+        profile = await habbo_api.get_user(entry["habbo"], hotel)
+        unique_id = profile.get("uniqueId") if profile else None
+        if unique_id:
+            self.update(entry["user_id"], unique_id=unique_id, hotel=hotel)
+        return unique_id
+
+    # ------------------------------------------------------------------ #
+    # mutations                                                          #
+    # ------------------------------------------------------------------ #
+    def add(self, user_id, habbo: str, save: bool = True, **fields) -> dict:
+        """Insert or update the entry for ``user_id`` and return it."""
+        entry = self.get(user_id)
+        if entry is None:
+            entry = {"user_id": str(user_id), "habbo": habbo}
+            self.data["verified_users"].append(entry)
+        else:
+            self._unindex(entry)
+            entry["habbo"] = habbo
+        entry.update(fields)
+        self._index(entry)
+        if save:
+            self.backend.upsert_verified_user(self.data, entry)
+        return entry
+
+    def rename(self, user_id, habbo: str, save: bool = True) -> dict:
+        """Change the Habbo name of a verified user, adding them if missing.
+
+        The stored uniqueId belonged to the old name, so it is cleared and
+        ``ensure_unique_id`` resolves the new one on next use.
+        """
+        return self.add(user_id, habbo, save=save, unique_id=None)
+
+    def update(self, user_id, save: bool = True, **fields) -> dict | None:
+        """Set extra fields on an existing entry without touching its name."""
+        entry = self.get(user_id)
+        if entry is None:
+            return None
+        entry.update(fields)
+        if save:
+            self.backend.upsert_verified_user(self.data, entry)
+        return entry
+
+    def remove(self, user_id, save: bool = True) -> bool:
+        entry = self.get(user_id)
+        if entry is None:
+            return False
+        # server.json can hold several rows for one user; drop them all
+        self.data["verified_users"] = [
+            u for u in self.data["verified_users"] if str(u.get("user_id")) != str(user_id)
+        ]
+        self._reindex()
+        if save:
+            self.backend.delete_verified_user(self.data, str(user_id))
+        return True
+
+
+_store: VerifiedUserStore | None = None
+
+
+def get_verified_store() -> VerifiedUserStore:
+    """Return the process-wide store, loading server.json on first use."""
+    global _store
+    if _store is None:
+        _store = VerifiedUserStore()
+    return _store
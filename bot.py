@@ -7,6 +7,9 @@ import logging
 import random
 import json
 
+from COGS.habbo_api import get_habbo_client
+from COGS.storage import get_backend
+
 # Setup basic configuration for logging
 LOG_FILE = "/home/pi/discord-bots/bots/CDA Admin/bot_errors.log"
 logging.basicConfig(
@@ -26,6 +29,9 @@ bot = commands.Bot(command_prefix="noah ", intents=intents, help_command=None)
 
 SERVER_FILE = "/home/pi/discord-bots/bots/CDA Admin/server.json"
 
+# Shared helper modules in COGS that are imported by cogs, not loaded as extensions
+HELPER_MODULES = {"habbo_api", "log_digest", "member_events", "member_roles", "paths", "punishment_index", "role_resolver", "storage", "verified_store"}
+
 # Dynamically discover .py files in the COGS directory
 def discover_extensions():
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,7 +42,7 @@ def discover_extensions():
     return [
         f"COGS.{file[:-3]}"
         for file in os.listdir(cogs_dir)
-        if file.endswith(".py") and not file.startswith("__")
+        if file.endswith(".py") and not file.startswith("__") and file[:-3] not in HELPER_MODULES
     ]
 
 def resolve_extension_name(extension: str) -> str:
@@ -180,6 +186,8 @@ async def restart(ctx):
     try:
         await ctx.send("Restarting the bot... Please wait!", delete_after=2.5)
         print("Bot is restarting...")
+        await get_backend().flush()
+        await get_habbo_client(bot).close()
         await bot.close()  # Closes the bot's connection to Discord
         os.execv(sys.executable, ['python'] + sys.argv)  # Restarts the script
     except Exception as e:
@@ -217,6 +225,8 @@ async def sync(command):
 @bot.command(name="stop")
 @commands.is_owner()
 async def stop(ctx):
+    await get_backend().flush()
+    await get_habbo_client(bot).close()
     await bot.close()
 
 @bot.event